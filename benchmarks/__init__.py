@@ -0,0 +1,12 @@
+"""
+Microbenchmarks of the core primitives of :mod:`royalnet`.
+
+Run them from the root of the repository with::
+
+    python -m benchmarks
+
+Each module in this package has a ``cases()`` function returning the :class:`~benchmarks._harness.Case`\\ s it
+defines; pass one or more :mod:`fnmatch` patterns to run only the matching cases, such as::
+
+    python -m benchmarks "router.*" --ops 50000 --json router.json
+"""
@@ -0,0 +1,45 @@
+"""
+Run the benchmarks and print their results.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import fnmatch
+import json
+import sys
+
+from . import dispenser, implementation, router, sentry, validation, wrench
+from ._harness import format_results, measure
+
+MODULES = (dispenser, sentry, wrench, router, implementation, validation)
+
+
+async def main(args: argparse.Namespace) -> None:
+    results = []
+    for module in MODULES:
+        for case in module.cases():
+            if args.patterns and not any(fnmatch.fnmatchcase(case.name, pattern) for pattern in args.patterns):
+                continue
+            result = await measure(case, operations=args.ops, warmup=args.warmup, samples=args.samples)
+            print(format_results([result]).splitlines()[-1] if results else format_results([result]), flush=True)
+            results.append(result)
+
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump({
+                "python": sys.version,
+                "results": [result.as_dict() for result in results],
+            }, file, indent=2)
+
+
+parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__)
+parser.add_argument("patterns", nargs="*", help="run only the cases matching these fnmatch patterns")
+parser.add_argument("--ops", type=int, default=10000, help="number of timed operations per case")
+parser.add_argument("--warmup", type=int, default=1000, help="number of operations to perform before timing")
+parser.add_argument("--samples", type=int, default=1000, help="number of operations to measure allocations of")
+parser.add_argument("--json", metavar="FILE", help="also write the results to this JSON file")
+
+if __name__ == "__main__":
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,44 @@
+"""
+This module contains the objects shared by multiple benchmarks.
+"""
+
+from __future__ import annotations
+
+import datetime
+
+import royalnet.engineer as engi
+
+
+class BenchmarkImplementation(engi.ConversationListImplementation):
+    """
+    A :class:`~royalnet.engineer.pda.implementations.base.ConversationListImplementation` which isn't connected to any
+    frontend, and is fed projectiles by the benchmarks themselves.
+    """
+
+    @property
+    def namespace(self) -> str:
+        return "benchmark"
+
+    async def run(self):
+        pass
+
+
+def message_received(text: str, id_: int = 1) -> engi.StaticMessageReceived:
+    """
+    :param text: The text of the message.
+    :param id_: The identifier of the message.
+    :return: A :class:`~royalnet.engineer.bullet.static.StaticMessageReceived` of a message with the given text.
+    """
+    return engi.StaticMessageReceived(engi.StaticMessage(
+        id_,
+        text=text,
+        timestamp=datetime.datetime(2021, 1, 1),
+        channel=engi.StaticChannel(1, name="benchmark"),
+        sender=engi.StaticUser(1, name="benchmark"),
+    ))
+
+
+async def nothing(**kwargs) -> None:
+    """
+    A conversation which does nothing.
+    """
@@ -0,0 +1,185 @@
+"""
+This module contains the objects used to define, measure and report benchmarks.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import gc
+import time
+import tracemalloc
+
+import royalnet.royaltyping as t
+
+
+@dataclasses.dataclass
+class Case:
+    """
+    A single operation to benchmark.
+    """
+
+    name: str
+    """
+    The name of the case, in the form ``group.case[parameter]``.
+    """
+
+    operation: t.Callable[[], t.Any]
+    """
+    The function performing the operation once; if :attr:`.asynchronous`, it must return an awaitable.
+    """
+
+    asynchronous: bool = False
+    """
+    Whether the value returned by :attr:`.operation` should be awaited.
+    """
+
+
+@dataclasses.dataclass
+class Result:
+    """
+    The measurements of a :class:`.Case`.
+    """
+
+    name: str
+    """
+    The name of the measured :class:`.Case`.
+    """
+
+    operations: int
+    """
+    The number of timed operations.
+    """
+
+    seconds: float
+    """
+    The total time taken by the timed operations.
+    """
+
+    p50: float
+    """
+    The median latency of a single operation, in seconds.
+    """
+
+    p99: float
+    """
+    The 99th percentile latency of a single operation, in seconds.
+    """
+
+    allocated: float
+    """
+    The average peak of memory allocated while performing an operation, in bytes.
+    """
+
+    retained: float
+    """
+    The average memory still allocated after performing an operation, in bytes.
+    """
+
+    @property
+    def throughput(self) -> float:
+        """
+        The number of operations per second.
+        """
+        return self.operations / self.seconds if self.seconds else float("inf")
+
+    def as_dict(self) -> dict[str, t.Any]:
+        """
+        :return: The result as a :class:`dict`, suitable to be serialized to JSON.
+        """
+        return {**dataclasses.asdict(self), "throughput": self.throughput}
+
+
+async def _run(case: Case) -> None:
+    if case.asynchronous:
+        await case.operation()
+    else:
+        case.operation()
+
+
+def _percentile(ordered: list[int], fraction: float) -> float:
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] / 1e9
+
+
+async def measure(case: Case, operations: int = 10000, warmup: int = 1000, samples: int = 1000) -> Result:
+    """
+    Measure a :class:`.Case`.
+
+    The case is performed ``warmup`` times without measuring it, then ``operations`` times with the garbage collector
+    disabled to measure its latency, and finally ``samples`` times under :mod:`tracemalloc` to measure its allocations.
+
+    :param case: The case to measure.
+    :param operations: The number of timed operations.
+    :param warmup: The number of operations to perform before measuring.
+    :param samples: The number of operations to measure the allocations of.
+    :return: The measured :class:`.Result`.
+    """
+
+    operation = case.operation
+    asynchronous = case.asynchronous
+    clock = time.perf_counter_ns
+
+    for _ in range(warmup):
+        await _run(case)
+
+    gc.collect()
+    gc.disable()
+    try:
+        timings = []
+        started = clock()
+        for _ in range(operations):
+            before = clock()
+            if asynchronous:
+                await operation()
+            else:
+                operation()
+            timings.append(clock() - before)
+        total = clock() - started
+    finally:
+        gc.enable()
+
+    tracemalloc.start()
+    try:
+        allocated = 0
+        baseline, _ = tracemalloc.get_traced_memory()
+        for _ in range(samples):
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            await _run(case)
+            _, peak = tracemalloc.get_traced_memory()
+            allocated += peak - before
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    timings.sort()
+    return Result(
+        name=case.name,
+        operations=operations,
+        seconds=total / 1e9,
+        p50=_percentile(timings, 0.50),
+        p99=_percentile(timings, 0.99),
+        allocated=allocated / samples if samples else 0.0,
+        retained=(current - baseline) / samples if samples else 0.0,
+    )
+
+
+def format_results(results: t.Iterable[Result]) -> str:
+    """
+    :param results: The results to format.
+    :return: A table of the results, one per line.
+    """
+    lines = [f"{'case':<48} {'ops/s':>12} {'p50 µs':>10} {'p99 µs':>10} {'alloc B':>10} {'kept B':>10}"]
+    for result in results:
+        lines.append(
+            f"{result.name:<48} {result.throughput:>12.0f} {result.p50 * 1e6:>10.2f} {result.p99 * 1e6:>10.2f} "
+            f"{result.allocated:>10.0f} {result.retained:>10.0f}"
+        )
+    return "\n".join(lines)
+
+
+__all__ = (
+    "Case",
+    "Result",
+    "format_results",
+    "measure",
+)
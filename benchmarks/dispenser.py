@@ -0,0 +1,24 @@
+"""
+Benchmarks of :meth:`royalnet.engineer.dispenser.Dispenser.put` with an increasing number of sentries.
+"""
+
+from __future__ import annotations
+
+import royalnet.engineer as engi
+from ._fixtures import message_received
+from ._harness import Case
+
+
+def _put(sentries: int) -> Case:
+    dispenser = engi.Dispenser()
+    for _ in range(sentries):
+        dispenser.sentries.append(engi.SentrySource(dispenser, queue_size=1, overflow=engi.OverflowPolicy.DROP_OLDEST))
+    dispenser.reindex()
+    projectile = message_received("Hello world!")
+
+    return Case(f"dispenser.put[{sentries} sentries]", lambda: dispenser.put(projectile), asynchronous=True)
+
+
+def cases():
+    for sentries in (1, 10, 100):
+        yield _put(sentries)
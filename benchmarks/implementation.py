@@ -0,0 +1,61 @@
+"""
+Benchmarks of :meth:`royalnet.engineer.pda.implementations.base.ConversationListImplementation.put` with an increasing
+number of conversations.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import re
+
+import royalnet.engineer as engi
+from ._fixtures import BenchmarkImplementation, message_received, nothing
+from ._harness import Case
+
+
+def _put(conversations: int) -> Case:
+    implementation = BenchmarkImplementation(f"put{conversations}")
+    for _ in range(conversations):
+        implementation.register_conversation(nothing)
+    projectile = message_received("Hello world!")
+
+    return Case(
+        f"implementation.put[{conversations} conversations]",
+        lambda: implementation.put(key=1, projectile=projectile),
+        asynchronous=True,
+    )
+
+
+def _put_routed() -> Case:
+    implementation = BenchmarkImplementation("routed")
+    router = engi.Router(lock_scope=engi.LockScope.MATCH)
+    waiting: list[asyncio.Future] = []
+
+    async def forever(**kwargs) -> None:
+        # Keep a reference to what the command waits on, so that its task isn't garbage collected
+        waiting.append(asyncio.get_running_loop().create_future())
+        await waiting[-1]
+
+    router.register_conversation(engi.DecoratingConversation(forever), ["slow"], [re.compile(r"^/slow")])
+    router.register_conversation(engi.DecoratingConversation(nothing), ["ping"], [re.compile(r"^/ping")])
+    implementation.register_conversation(router)
+    slow = message_received("/slow")
+    ping = message_received("/ping")
+
+    async def put():
+        # The first put starts a command which never ends, and whose sentry must not block the following ones
+        if not waiting:
+            await implementation.put(key=1, projectile=slow)
+            for _ in range(10):
+                await asyncio.sleep(0)
+            if not waiting:
+                raise AssertionError("The slow command wasn't started")
+        await implementation.put(key=1, projectile=ping)
+
+    return Case("implementation.put[router, slow command running]", put, asynchronous=True)
+
+
+def cases():
+    for conversations in (0, 1, 10, 100):
+        yield _put(conversations)
+    yield _put_routed()
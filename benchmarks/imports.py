@@ -0,0 +1,112 @@
+"""
+Measure how long importing :mod:`royalnet` takes in a fresh interpreter, and check that the heavy optional dependencies
+are not imported along with it.
+
+.. code-block:: console
+
+   $ python -m benchmarks.imports royalnet.engineer --runs 20 --max-ms 50
+
+The exit status is ``1`` if a forbidden module was imported, or if the median import time exceeds ``--max-ms``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+import royalnet.royaltyping as t
+
+_CHILD = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+print(json.dumps({{"seconds": elapsed, "modules": sorted(sys.modules)}}))
+"""
+"""
+The code run by every child interpreter, which prints the time the import took and the loaded modules.
+"""
+
+
+def measure_import(module: str) -> tuple[float, list[str]]:
+    """
+    Import a module in a new interpreter.
+
+    :param module: The name of the module to import.
+    :return: The number of seconds the import took, and the names of all the modules loaded by the interpreter.
+    """
+    output = subprocess.run(
+        [sys.executable, "-c", _CHILD.format(module=module)],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    result = json.loads(output.splitlines()[-1])
+    return result["seconds"], result["modules"]
+
+
+def slowest_imports(module: str, count: int) -> list[tuple[int, str]]:
+    """
+    Import a module in a new interpreter with ``-X importtime``.
+
+    :param module: The name of the module to import.
+    :param count: The number of modules to return.
+    :return: The ``count`` modules which took the longest to import, including their own imports, as
+             ``(microseconds, name)`` pairs.
+    """
+    lines = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stderr.splitlines()
+
+    timings = []
+    for line in lines:
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        timings.append((int(cumulative), name.strip()))
+    return sorted(timings, reverse=True)[:count]
+
+
+def main(args: argparse.Namespace) -> int:
+    failed = False
+    for module in args.modules:
+        timings: list[float] = []
+        modules: t.Optional[list[str]] = None
+        for _ in range(args.runs):
+            seconds, modules = measure_import(module)
+            timings.append(seconds)
+
+        median = statistics.median(timings)
+        print(f"{module:<32} median {median * 1000:8.2f}ms  min {min(timings) * 1000:8.2f}ms  "
+              f"{len(modules)} modules loaded", flush=True)
+
+        if forbidden := sorted({name.partition(".")[0] for name in modules} & set(args.forbid)):
+            print(f"  FAIL: imported {', '.join(forbidden)}")
+            failed = True
+        if args.max_ms is not None and median * 1000 > args.max_ms:
+            print(f"  FAIL: slower than {args.max_ms}ms")
+            failed = True
+
+        for microseconds, name in slowest_imports(module, args.slowest) if args.slowest else ():
+            print(f"  {microseconds / 1000:8.2f}ms  {name}")
+
+    return 1 if failed else 0
+
+
+parser = argparse.ArgumentParser(prog="python -m benchmarks.imports", description=__doc__.split("\n\n")[0])
+parser.add_argument("modules", nargs="*", default=["royalnet", "royalnet.engineer"], help="the modules to import")
+parser.add_argument("--runs", type=int, default=10, help="how many fresh interpreters to import each module in")
+parser.add_argument("--forbid", nargs="*", default=["pydantic", "sqlalchemy"],
+                    help="the top-level packages which must not be imported")
+parser.add_argument("--max-ms", type=float, help="the maximum median import time allowed, in milliseconds")
+parser.add_argument("--slowest", type=int, default=0, metavar="N",
+                    help="also show the N modules which took the longest to import")
+
+if __name__ == "__main__":
+    sys.exit(main(parser.parse_args()))
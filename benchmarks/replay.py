@@ -0,0 +1,45 @@
+"""
+Replay a recording made with :class:`royalnet.engineer.pda.recording.Recorder` against a PDA implementation, and report
+the end-to-end latency and the throughput.
+
+.. code-block:: console
+
+   $ python -m benchmarks.replay traffic.rnr.gz mybot.pda:create_implementation --speed 10
+
+The target is the import path of a function which takes no arguments and returns the
+:class:`~royalnet.engineer.pda.implementations.base.ConversationListImplementation` to replay the recording against.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import importlib
+
+from royalnet.engineer.pda.recording import open_recording, replay
+
+
+def load_target(path: str):
+    module, _, name = path.partition(":")
+    return getattr(importlib.import_module(module), name)
+
+
+async def main(args: argparse.Namespace) -> None:
+    implementation = load_target(args.target)()
+    for run in range(args.runs):
+        with open_recording(args.recording) as file:
+            report = await replay(implementation, file, speed=None if args.max else args.speed, timeout=args.timeout)
+        print(f"Run {run + 1}: {report}", flush=True)
+
+
+parser = argparse.ArgumentParser(prog="python -m benchmarks.replay", description=__doc__.split("\n\n")[0])
+parser.add_argument("recording", help="the recording to replay; gzipped if its name ends with .gz")
+parser.add_argument("target", help="a module:function returning the implementation to replay the recording against")
+parser.add_argument("--speed", type=float, default=1.0, help="how many times faster than recorded to replay")
+parser.add_argument("--max", action="store_true", help="replay as fast as possible, ignoring the recorded timing")
+parser.add_argument("--timeout", type=float, default=10.0,
+                    help="how many seconds to wait for the projectiles to be delivered after the last one is put")
+parser.add_argument("--runs", type=int, default=1, help="how many times to replay the recording")
+
+if __name__ == "__main__":
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,29 @@
+"""
+Benchmarks of the dispatch of :class:`royalnet.engineer.router.Router` with an increasing number of patterns.
+"""
+
+from __future__ import annotations
+
+import re
+
+import royalnet.engineer as engi
+from ._fixtures import nothing
+from ._harness import Case
+
+
+def _router(patterns: int) -> engi.Router:
+    router = engi.Router()
+    for index in range(patterns):
+        pattern = re.compile(rf"^!cmd{index}\b(?P<args>.*)$")
+        router.register_conversation(engi.DecoratingConversation(nothing), [], [pattern])
+    router.register_conversation(engi.DecoratingConversation(nothing), ["ping"], [re.compile(r"^/ping\b(?P<args>.*)$")])
+    return router
+
+
+def cases():
+    for patterns in (1, 10, 100, 1000):
+        router = _router(patterns)
+        last = f"!cmd{patterns - 1} Hello world!"
+        yield Case(f"router.match[{patterns} patterns, last]", lambda r=router, x=last: r.match(x))
+        yield Case(f"router.match[{patterns} patterns, none]", lambda r=router: r.match("Hello world!"))
+        yield Case(f"router.match[{patterns} patterns, name]", lambda r=router: r.match("/ping Hello world!"))
@@ -0,0 +1,30 @@
+"""
+Benchmarks of :class:`royalnet.engineer.sentry.SentryFilter` chains of increasing depth.
+"""
+
+from __future__ import annotations
+
+import royalnet.engineer as engi
+from royalnet.engineer import wrench as w
+from ._fixtures import message_received
+from ._harness import Case
+
+
+def _get(depth: int) -> Case:
+    dispenser = engi.Dispenser()
+    source = engi.SentrySource(dispenser, queue_size=0)
+    sentry = source
+    for _ in range(depth):
+        sentry = sentry.filter(w.PassAll())
+    projectile = message_received("Hello world!")
+
+    async def operation():
+        source.put_nowait(projectile)
+        await sentry.get()
+
+    return Case(f"sentry.get[depth {depth}]", operation, asynchronous=True)
+
+
+def cases():
+    for depth in (1, 4, 16):
+        yield _get(depth)
@@ -0,0 +1,63 @@
+"""
+Benchmarks of the overhead of :class:`royalnet.validation.ValidatingFunction` over a plain function call.
+"""
+
+import pydantic
+
+import royalnet.royaltyping as t
+from royalnet.validation import InputValidationError, PydanticBackend, SimpleBackend, ValidatingFunction
+from ._harness import Case
+
+
+def scalar(count: int, name: str) -> str:
+    return f"{name}{count}"
+
+
+def optional(count: int, name: str) -> t.Optional[str]:
+    return f"{name}{count}"
+
+
+def command(count: int, name: str, mode: t.Literal["a", "b"] = "a", _extra: t.Any = None) -> str:
+    return f"{name}{count}"
+
+
+def constrained(name: str = pydantic.Field("a", max_length=3), count: int = pydantic.Field(1, gt=0)) -> str:
+    return f"{name}{count}"
+
+
+def cases():
+    yield Case("validation.plain", lambda: command(count=2, name="x"))
+
+    exact = ValidatingFunction(scalar)
+    yield Case("validation.fast path[exact types]", lambda: exact(count=2, name="x"))
+
+    for backend in (PydanticBackend, SimpleBackend):
+        function = ValidatingFunction(command, backends=(backend,))
+        yield Case(
+            f"validation.{backend.__name__}[coerced]",
+            lambda f=function: f(count="2", name="x", mode="b", _extra=1),
+        )
+
+    validated = ValidatingFunction(optional)
+    yield Case("validation.pydantic[output]", lambda: validated(count=2, name="x"))
+
+    sampled = ValidatingFunction(optional, sample_rate=0.1)
+    yield Case("validation.pydantic[output, 10% sampled]", lambda: sampled(count=2, name="x"))
+
+    fields = ValidatingFunction(constrained)
+    checked = []
+
+    def call_constrained():
+        # Check once, when the case is first run, that the fast path doesn't skip the constraints of the fields
+        if not checked:
+            for kwargs in ({"name": "abcdef", "count": 1}, {"name": "a", "count": -5}):
+                try:
+                    fields(**kwargs)
+                except InputValidationError:
+                    pass
+                else:
+                    raise AssertionError(f"The constraints of {constrained!r} weren't checked for {kwargs!r}")
+            checked.append(True)
+        return fields(name="abc", count=2)
+
+    yield Case("validation.pydantic[Field constraints]", call_constrained)
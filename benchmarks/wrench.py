@@ -0,0 +1,36 @@
+"""
+Benchmarks of the built-in :mod:`royalnet.engineer.wrench`\\ es, applied like a
+:class:`~royalnet.engineer.sentry.SentryFilter` would.
+"""
+
+from __future__ import annotations
+
+import re
+
+from royalnet.engineer import wrench as w
+from ._fixtures import message_received
+from ._harness import Case
+
+
+def _stage(wrench: w.Wrench, obj) -> Case:
+    function, synchronous = w.stage(wrench)
+    name = f"wrench.{wrench.__class__.__qualname__}"
+    if synchronous:
+        return Case(name, lambda: function(obj))
+    return Case(name, lambda: function(obj), asynchronous=True)
+
+
+def cases():
+    text = "/ping Hello world!"
+    yield _stage(w.PassAll(), text)
+    yield _stage(w.DiscardAll(), text)
+    yield _stage(w.Type(str), text)
+    yield _stage(w.StartsWith("/ping"), text)
+    yield _stage(w.EndsWith("!"), text)
+    yield _stage(w.Choice("/ping", text), text)
+    yield _stage(w.RegexCheck(re.compile(r"^/ping\b")), text)
+    yield _stage(w.RegexMatch(re.compile(r"^/(?P<command>\w+)")), text)
+    yield _stage(w.RegexReplace(re.compile(r"world"), "royalnet"), text)
+    yield _stage(w.Lambda(str.lower), text)
+    yield _stage(w.Check(str.isprintable, "Not printable"), text)
+    yield _stage(w.MessageText(), message_received(text))
@@ -2,5 +2,44 @@
 Royalnet is a multiplatform chatbot library which allows to write bots only once for most chat platforms and at the same time maintain the versatility of using a platform-specific framework.
 """
 
+import importlib
+
+import royalnet.royaltyping as t
 from .exc import *
-from .validation import *
+from .tracing import *
+
+if t.TYPE_CHECKING:
+    from .validation import *
+
+_exports: dict[str, str] = dict.fromkeys((
+    "ValidationError",
+    "InputValidationError",
+    "OutputValidationError",
+    "ValidationBackend",
+    "PydanticBackend",
+    "SimpleBackend",
+    "ValidatingFunction",
+), "validation")
+"""
+A :class:`dict` mapping the names exported by this package which are imported only when first accessed to the
+submodule they are defined in, so that :mod:`pydantic` is imported only by the programs which use
+:mod:`royalnet.validation`.
+"""
+
+
+def __getattr__(name: str) -> t.Any:
+    if (submodule := _exports.get(name)) is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = globals()[name] = getattr(importlib.import_module(f".{submodule}", __name__), name)
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *_exports})
+
+
+__all__ = (
+    *exc.__all__,
+    *tracing.__all__,
+    *_exports,
+)
@@ -3,17 +3,141 @@ Chat bot utilities.
 
 All names are inspired by the `Engineer Class of Team Fortress 2 <https://wiki.teamfortress.com/wiki/Engineer>`_.
 
+The submodules of this package are imported only when one of the names they export is first accessed, so that
+importing :mod:`royalnet.engineer` is cheap, and optional dependencies are loaded only by the programs which use them.
+
 .. image: /_static/engineer_diagram.png
 """
 
-from .bolts import *
-from .bullet import *
-from .conversation import *
-from .discard import *
-from .dispenser import *
-from .exc import *
-from .pda import *
-from .router import *
-from .sentry import *
-from .teleporter import *
-from .wrench import *
+import importlib
+
+import royalnet.royaltyping as t
+
+if t.TYPE_CHECKING:
+    from .bullet import *
+    from .conversation import *
+    from .discard import *
+    from .dispenser import *
+    from .exc import *
+    from .metrics import *
+    from .pda import *
+    from .router import *
+    from .sentry import *
+    from .wrench import *
+
+_submodules = (
+    "bullet",
+    "conversation",
+    "discard",
+    "dispenser",
+    "exc",
+    "metrics",
+    "pda",
+    "router",
+    "sentry",
+    "wrench",
+)
+"""
+The submodules of this package, imported on first access.
+"""
+
+_exports: dict[str, str] = {
+    **dict.fromkeys((
+        "BulletContents",
+        "BulletException",
+        "Button",
+        "ButtonReaction",
+        "Casing",
+        "CasingCache",
+        "Channel",
+        "ForbiddenError",
+        "FrontendError",
+        "IdentityMap",
+        "Message",
+        "MessageDeleted",
+        "MessageEdited",
+        "MessageReceived",
+        "NotSupportedError",
+        "Projectile",
+        "Reaction",
+        "StaticChannel",
+        "StaticMessage",
+        "StaticMessageReceived",
+        "StaticUser",
+        "User",
+        "UserJoined",
+        "UserLeft",
+        "UserUpdate",
+        "cached_async_property",
+        "single_flight",
+    ), "bullet"),
+    **dict.fromkeys(("Conversation", "DecoratingConversation", "TeleportingConversation"), "conversation"),
+    **dict.fromkeys(("Discard", "DISCARD"), "discard"),
+    **dict.fromkeys(("Dispenser", "DispenserException", "LockedDispenserError"), "dispenser"),
+    **dict.fromkeys(("EngineerException",), "exc"),
+    **dict.fromkeys(("Counter", "Gauge", "Histogram", "Metric", "MetricsRegistry", "default_registry"), "metrics"),
+    **dict.fromkeys((
+        "ConversationListImplementation",
+        "ImplementationAlreadyBoundError",
+        "ImplementationException",
+        "Journal",
+        "LagMonitor",
+        "PDA",
+        "PDAImplementation",
+        "Recorder",
+        "ReplayReport",
+        "ShardedConversationListImplementation",
+        "open_recording",
+        "read_recording",
+        "replay",
+    ), "pda"),
+    **dict.fromkeys(("LockScope", "Router"), "router"),
+    **dict.fromkeys((
+        "OverflowPolicy",
+        "Sentry",
+        "SentryClosedError",
+        "SentryException",
+        "SentryFilter",
+        "SentrySource",
+    ), "sentry"),
+    **dict.fromkeys((
+        "AsyncLambda",
+        "Check",
+        "CheckBase",
+        "Choice",
+        "DeliberateException",
+        "EndsWith",
+        "Lambda",
+        "MessageText",
+        "RegexCheck",
+        "RegexMatch",
+        "RegexReplace",
+        "StartsWith",
+        "SyncCheckBase",
+        "SyncWrench",
+        "Type",
+        "Wrench",
+        "WrenchException",
+        "stage",
+    ), "wrench"),
+}
+"""
+A :class:`dict` mapping the names exported by this package to the submodule they are defined in.
+"""
+
+
+def __getattr__(name: str) -> t.Any:
+    if name in _submodules:
+        return importlib.import_module(f".{name}", __name__)
+    if (submodule := _exports.get(name)) is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = globals()[name] = getattr(importlib.import_module(f".{submodule}", __name__), name)
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *_submodules, *_exports})
+
+
+__all__ = tuple(_exports)
@@ -1,4 +1,7 @@
+from .cache import *
 from .casing import *
 from .contents import *
 from .exc import *
+from .identity import *
 from .projectiles import *
+from .static import *
@@ -0,0 +1,217 @@
+"""
+This module contains :class:`.CasingCache` and the :func:`.cached_async_property` decorator, which can be used by
+PDA implementations to avoid fetching the same data multiple times from the frontend.
+"""
+
+from __future__ import annotations
+
+import collections
+import functools
+import logging
+import time
+import weakref
+
+import async_property as ap
+
+import royalnet.royaltyping as t
+from . import exc
+from .casing import single_flight
+from .projectiles import MessageDeleted, MessageEdited, UserUpdate
+
+if t.TYPE_CHECKING:
+    from .casing import Casing
+    from .projectiles import Projectile
+
+log = logging.getLogger(__name__)
+
+MISSING = object()
+"""
+The value returned by :meth:`.CasingCache.get` if nothing is cached.
+"""
+
+
+class CasingCache:
+    """
+    A cache storing the values of :func:`.cached_async_property`\\ s of :class:`~royalnet.engineer.bullet.casing.Casing`
+    objects.
+
+    Values are shared between all objects with the same class and the same :func:`hash`, so that the data fetched for
+    an object is available to all the other objects representing the same remote entity.
+    """
+
+    invalidated_by: dict[t.Type["Projectile"], str] = {
+        MessageEdited: "message",
+        MessageDeleted: "message",
+        UserUpdate: "user",
+    }
+    """
+    A :class:`dict` mapping types of projectiles to the name of their property containing the object whose cached
+    values should be invalidated when they are received.
+
+    .. seealso:: :meth:`.invalidate_related`
+    """
+
+    def __init__(self, max_entries: t.Optional[int] = 4096):
+        self.max_entries: t.Optional[int] = max_entries
+        """
+        The maximum number of objects to cache values of before evicting the least recently used one, or :data:`None`
+        to never evict them.
+        """
+
+        self.entries: collections.OrderedDict[tuple[type, int], dict[str, tuple[t.Any, float]]] = \
+            collections.OrderedDict()
+        """
+        A :class:`collections.OrderedDict` mapping ``(class, hash)`` pairs to :class:`dict`\\ s of cached values and
+        their expiration times, from the least recently used to the most recently used.
+        """
+
+        self.hits: int = 0
+        """
+        The number of values found in the cache.
+        """
+
+        self.misses: int = 0
+        """
+        The number of values not found in the cache.
+        """
+
+        caches.add(self)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, casing: "Casing", name: str) -> t.Any:
+        """
+        Get a cached value.
+
+        :param casing: The object the value belongs to.
+        :param name: The name of the property.
+        :return: The cached value, or :data:`.MISSING` if there isn't one or if it has expired.
+        """
+        key = (casing.__class__, hash(casing))
+        if (values := self.entries.get(key)) is not None and (cached := values.get(name)) is not None:
+            value, expires = cached
+            if expires > time.monotonic():
+                self.hits += 1
+                self.entries.move_to_end(key)
+                return value
+            del values[name]
+        self.misses += 1
+        return MISSING
+
+    def set(self, casing: "Casing", name: str, value: t.Any, ttl: t.Optional[float] = None) -> None:
+        """
+        Cache a value.
+
+        :param casing: The object the value belongs to.
+        :param name: The name of the property.
+        :param value: The value to cache.
+        :param ttl: For how many seconds the value should be cached, or :data:`None` to cache it until it is
+                    invalidated.
+        """
+        key = (casing.__class__, hash(casing))
+        expires = time.monotonic() + ttl if ttl is not None else float("inf")
+        self.entries.setdefault(key, {})[name] = (value, expires)
+        self.entries.move_to_end(key)
+        if self.max_entries is not None and len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def invalidate(self, casing: "Casing") -> None:
+        """
+        Remove all the cached values of an object.
+
+        :param casing: The object to remove the cached values of.
+        """
+        log.debug(f"Invalidating cache of: {casing!r}")
+        self.entries.pop((casing.__class__, hash(casing)), None)
+
+    async def invalidate_related(self, projectile: "Projectile") -> None:
+        """
+        If the projectile is one of the types in :attr:`.invalidated_by`, remove all the cached values of the related
+        object.
+
+        :param projectile: The received projectile.
+        """
+        if not self.entries:
+            return
+
+        for type_, name in self.invalidated_by.items():
+            if isinstance(projectile, type_):
+                try:
+                    related = await getattr(projectile, name)
+                except exc.NotSupportedError:
+                    return
+                except Exception:
+                    log.exception(f"Can't get the {name} of {projectile!r} to invalidate its cached values")
+                    return
+                if related is not None:
+                    self.invalidate(related)
+                return
+
+
+caches: weakref.WeakSet[CasingCache] = weakref.WeakSet()
+"""
+A :class:`weakref.WeakSet` of all the :class:`.CasingCache`\\ s which exist.
+"""
+
+default_cache = CasingCache()
+"""
+The :class:`.CasingCache` used by :func:`.cached_async_property` if no other cache is specified.
+"""
+
+
+async def invalidate_related(projectile: "Projectile") -> None:
+    """
+    :meth:`.CasingCache.invalidate_related` in all the existing :data:`.caches`.
+
+    :param projectile: The received projectile.
+    """
+    for cache in list(caches):
+        await cache.invalidate_related(projectile)
+
+
+def cached_async_property(ttl: t.Union[float, t.Callable, None] = None, cache: t.Optional[CasingCache] = None):
+    """
+    A decorator which works like :func:`~async_property.async_property`, but stores the returned value in a
+    :class:`.CasingCache`.
+
+    Concurrent cache misses for the same object are coalesced with
+    :func:`~royalnet.engineer.bullet.casing.single_flight`.
+
+    .. code-block::
+
+       class DiscordUser(engi.User):
+           @cached_async_property(ttl=60)
+           async def name(self) -> str:
+               ...
+
+    :param ttl: For how many seconds values should be cached, or :data:`None` to cache them until they are invalidated.
+    :param cache: The :class:`.CasingCache` to use; if :data:`None`, :data:`.default_cache` is used.
+    """
+
+    if callable(ttl):
+        return cached_async_property()(ttl)
+
+    def decorator(func: t.Callable[[t.Any], t.Awaitable[t.Any]]):
+        name = func.__name__
+        fetch = single_flight(func)
+
+        @functools.wraps(func)
+        async def wrapper(self):
+            store = cache if cache is not None else default_cache
+            if (value := store.get(self, name)) is not MISSING:
+                return value
+            value = await fetch(self)
+            store.set(self, name, value, ttl)
+            return value
+
+        wrapper.__coalesced__ = True
+        return ap.async_property(wrapper)
+
+    return decorator
+
+
+__all__ = (
+    "CasingCache",
+    "cached_async_property",
+)
@@ -5,6 +5,47 @@ This module contains the base :class:`.Casing` class.
 from __future__ import annotations
 
 import abc
+import asyncio
+import functools
+
+import async_property as ap
+
+import royalnet.royaltyping as t
+
+_in_flight: dict[tuple[type, int, str], asyncio.Task] = {}
+"""
+A :class:`dict` mapping ``(class, hash, property name)`` to the :class:`asyncio.Task` which is currently fetching that
+property.
+"""
+
+
+def single_flight(func: t.Callable[[t.Any], t.Awaitable[t.Any]]) -> t.Callable[[t.Any], t.Awaitable[t.Any]]:
+    """
+    Wrap the getter of an :func:`~async_property.async_property` so that, while it is being awaited for an object,
+    concurrent awaits of the same property on objects with the same class and :func:`hash` share its result instead
+    of calling the getter again.
+
+    :param func: The getter to wrap.
+    :return: The wrapped getter.
+    """
+
+    if getattr(func, "__coalesced__", False):
+        return func
+
+    name = func.__name__
+
+    @functools.wraps(func)
+    async def wrapper(self):
+        key = (self.__class__, hash(self), name)
+        if (task := _in_flight.get(key)) is None:
+            task = asyncio.ensure_future(func(self))
+            _in_flight[key] = task
+            task.add_done_callback(lambda _: _in_flight.pop(key, None))
+        # A cancelled awaiter should not cancel the fetch for all the others
+        return await asyncio.shield(task)
+
+    wrapper.__coalesced__ = True
+    return wrapper
 
 
 class Casing(metaclass=abc.ABCMeta):
@@ -26,8 +67,31 @@ class Casing(metaclass=abc.ABCMeta):
       :meth:`Message.reply_to` will be :data:`None`.
 
     - The data is returned.
+
+    Subclasses can be defined with the ``coalesce=True`` keyword to apply :func:`.single_flight` to all the
+    :func:`~async_property.async_property`\\ s they define:
+
+    .. code-block::
+
+       class DiscordUser(engi.User, coalesce=True):
+           @async_property
+           async def name(self) -> str:
+               ...
     """
 
+    __slots__ = ()
+
+    def __init_subclass__(cls, coalesce: t.Optional[bool] = None, **kwargs):
+        super().__init_subclass__(**kwargs)
+
+        if coalesce is not None:
+            cls.__coalesce__ = coalesce
+
+        if getattr(cls, "__coalesce__", False):
+            for name, value in list(cls.__dict__.items()):
+                if isinstance(value, ap.base.AsyncPropertyDescriptor):
+                    setattr(cls, name, ap.async_property(single_flight(value.__wrapped__)))
+
     def __init__(self):
         """
         Instantiate a new instance of this class.
@@ -42,3 +106,9 @@ class Casing(metaclass=abc.ABCMeta):
 
     def __eq__(self, other) -> bool:
         return self.__class__ is other.__class__ and hash(self) == hash(other)
+
+
+__all__ = (
+    "Casing",
+    "single_flight",
+)
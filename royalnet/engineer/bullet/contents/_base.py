@@ -10,6 +10,8 @@ class BulletContents(casing.Casing, metaclass=abc.ABCMeta):
     Abstract base class for bullet contents.
     """
 
+    __slots__ = ()
+
 
 __all__ = (
     "BulletContents",
@@ -8,6 +8,8 @@ class Button(BulletContents, metaclass=abc.ABCMeta):
     An abstract class representing a clickable button.
     """
 
+    __slots__ = ()
+
     @ap.async_property
     async def text(self) -> t.Optional[str]:
         """
@@ -13,6 +13,8 @@ class ButtonReaction(Button, metaclass=abc.ABCMeta):
     An abstract class representing a clickable reaction to a message.
     """
 
+    __slots__ = ()
+
     @ap.async_property
     async def reactions(self) -> t.List["Reaction"]:
         """
@@ -12,6 +12,8 @@ class Channel(BulletContents, metaclass=abc.ABCMeta):
     An abstract class representing a channel where messages can be sent.
     """
 
+    __slots__ = ()
+
     @ap.async_property
     async def name(self) -> t.Optional[str]:
         """
@@ -15,6 +15,8 @@ class Message(BulletContents, metaclass=abc.ABCMeta):
     An abstract class representing a chat message.
     """
 
+    __slots__ = ()
+
     @ap.async_property
     async def text(self) -> t.Optional[str]:
         """
@@ -3,6 +3,8 @@ from __future__ import annotations
 from ._imports import *
 
 if t.TYPE_CHECKING:
+    import sqlalchemy.orm as so
+
     from .channel import Channel
 
 
@@ -11,6 +13,8 @@ class User(BulletContents, metaclass=abc.ABCMeta):
     An abstract class representing a user who can read or send messages in the chat.
     """
 
+    __slots__ = ()
+
     @ap.async_property
     async def name(self) -> t.Optional[str]:
         """
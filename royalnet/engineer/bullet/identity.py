@@ -0,0 +1,82 @@
+"""
+This module contains :class:`.IdentityMap`, which PDA implementations can use to avoid having multiple
+:class:`~royalnet.engineer.bullet.casing.Casing` objects representing the same remote entity.
+"""
+
+from __future__ import annotations
+
+import weakref
+
+import royalnet.royaltyping as t
+
+if t.TYPE_CHECKING:
+    from .casing import Casing
+
+    C = t.TypeVar("C", bound=Casing)
+
+
+class IdentityMap:
+    """
+    A registry of the canonical instances of :class:`~royalnet.engineer.bullet.casing.Casing` objects, identified by
+    their class and their :func:`hash`.
+
+    Instances are referenced weakly, and are removed from the registry as soon as nothing else is using them.
+    """
+
+    def __init__(self):
+        self.instances: weakref.WeakValueDictionary[tuple[type, int], "Casing"] = weakref.WeakValueDictionary()
+        """
+        A :class:`weakref.WeakValueDictionary` mapping ``(class, hash)`` pairs to the canonical instance.
+        """
+
+    def __len__(self) -> int:
+        return len(self.instances)
+
+    def __reduce__(self):
+        # Weak references cannot be pickled, and canonical instances only make sense in the process they were made in
+        return self.__class__, ()
+
+    def __contains__(self, casing: "Casing") -> bool:
+        return (casing.__class__, hash(casing)) in self.instances
+
+    def get(self, cls: t.Type["C"], hash_: int) -> t.Optional["C"]:
+        """
+        Get the canonical instance with the given class and hash, if there is one.
+
+        :param cls: The class of the instance.
+        :param hash_: The :func:`hash` of the instance.
+        :return: The canonical instance, or :data:`None` if there isn't one.
+        """
+        return self.instances.get((cls, hash_))
+
+    def canonical(self, casing: "C") -> "C":
+        """
+        Get the canonical instance equal to the given object, making the object canonical if there isn't one yet.
+
+        .. code-block::
+
+           user = self.identities.canonical(DiscordUser(member))
+
+        :param casing: The object to get the canonical instance of.
+        :return: The canonical instance.
+        """
+        return self.instances.setdefault((casing.__class__, hash(casing)), casing)
+
+    def get_or_create(self, cls: t.Type["C"], hash_: int, factory: t.Callable[[], "C"]) -> "C":
+        """
+        Get the canonical instance with the given class and hash, or create it with ``factory`` if there isn't one,
+        avoiding the creation of a throwaway object when the hash is known in advance.
+
+        :param cls: The class of the instance.
+        :param hash_: The :func:`hash` of the instance.
+        :param factory: A function creating the instance; the created instance must have the specified hash.
+        :return: The canonical instance.
+        """
+        if (casing := self.instances.get((cls, hash_))) is None:
+            casing = self.canonical(factory())
+        return casing
+
+
+__all__ = (
+    "IdentityMap",
+)
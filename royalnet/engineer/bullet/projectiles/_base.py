@@ -14,6 +14,8 @@ class Projectile(casing.Casing, metaclass=abc.ABCMeta):
     Abstract base class for external events which can be inserted in a dispenser.
     """
 
+    __slots__ = ()
+
 
 __all__ = (
     "Projectile",
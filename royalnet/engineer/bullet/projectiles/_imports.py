@@ -1,7 +1,6 @@
 import abc
 
 import async_property as ap
-import sqlalchemy.orm as so
 
 import royalnet.royaltyping as t
 from ._base import Projectile
@@ -9,7 +8,6 @@ from .. import exc
 
 __all__ = (
     "t",
-    "so",
     "abc",
     "ap",
     "exc",
@@ -16,6 +16,8 @@ class MessageReceived(Projectile, metaclass=abc.ABCMeta):
     An abstract class representing the reception of a single message.
     """
 
+    __slots__ = ()
+
     @ap.async_property
     async def message(self) -> "Message":
         """
@@ -29,6 +31,8 @@ class MessageEdited(Projectile, metaclass=abc.ABCMeta):
     An abstract class representing the editing of a single message.
     """
 
+    __slots__ = ()
+
     @ap.async_property
     async def message(self) -> "Message":
         """
@@ -42,6 +46,8 @@ class MessageDeleted(Projectile, metaclass=abc.ABCMeta):
     An abstract class representing the deletion of a single message.
     """
 
+    __slots__ = ()
+
     @ap.async_property
     async def message(self) -> "Message":
         """
@@ -16,6 +16,8 @@ class Reaction(Projectile, metaclass=abc.ABCMeta):
     An abstract class representing a reaction of a single user to a message, generated by clicking on a ButtonReaction.
     """
 
+    __slots__ = ()
+
     @ap.async_property
     async def user(self) -> "User":
         """
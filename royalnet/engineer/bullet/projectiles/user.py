@@ -16,6 +16,8 @@ class UserJoined(Projectile, metaclass=abc.ABCMeta):
     An abstract class representing an user who just joined the chat channel.
     """
 
+    __slots__ = ()
+
     @ap.async_property
     async def user(self) -> "User":
         """
@@ -29,6 +31,8 @@ class UserLeft(Projectile, metaclass=abc.ABCMeta):
     An abstract class representing an user who just left the chat channel.
     """
 
+    __slots__ = ()
+
     @ap.async_property
     async def user(self) -> "User":
         """
@@ -42,6 +46,8 @@ class UserUpdate(Projectile, metaclass=abc.ABCMeta):
     An abstract class representing a change in status of an user in the chat channel.
     """
 
+    __slots__ = ()
+
     @ap.async_property
     async def user(self) -> "User":
         """
@@ -0,0 +1,165 @@
+"""
+This module contains compact concrete implementations of the most common bullets, which hold values that are already
+known instead of fetching them from a remote location.
+
+They use ``__slots__``, so they don't have a per-instance ``__dict__``, and they are hashed by a single identifier.
+"""
+
+from __future__ import annotations
+
+import datetime
+
+import async_property as ap
+
+import royalnet.royaltyping as t
+from .contents.channel import Channel
+from .contents.message import Message
+from .contents.user import User
+from .projectiles.message import MessageReceived
+
+
+class StaticUser(User):
+    """
+    A :class:`~royalnet.engineer.bullet.contents.user.User` whose data is already known.
+    """
+
+    __slots__ = ("id", "_name", "__weakref__")
+
+    def __init__(self, id_: t.Hashable, *, name: t.Optional[str] = None):
+        super().__init__()
+        self.id: t.Hashable = id_
+        self._name: t.Optional[str] = name
+
+    def __hash__(self) -> int:
+        return hash(self.id)
+
+    def __repr__(self):
+        return f"<{self.__class__.__qualname__} {self.id!r}>"
+
+    @ap.async_property
+    async def name(self) -> t.Optional[str]:
+        return self._name
+
+
+class StaticChannel(Channel):
+    """
+    A :class:`~royalnet.engineer.bullet.contents.channel.Channel` whose data is already known.
+    """
+
+    __slots__ = ("id", "_name", "_topic", "_users", "__weakref__")
+
+    def __init__(self,
+                 id_: t.Hashable,
+                 *,
+                 name: t.Optional[str] = None,
+                 topic: t.Optional[str] = None,
+                 users: t.Optional[t.List[User]] = None):
+        super().__init__()
+        self.id: t.Hashable = id_
+        self._name: t.Optional[str] = name
+        self._topic: t.Optional[str] = topic
+        self._users: t.Optional[t.List[User]] = users
+
+    def __hash__(self) -> int:
+        return hash(self.id)
+
+    def __repr__(self):
+        return f"<{self.__class__.__qualname__} {self.id!r}>"
+
+    @ap.async_property
+    async def name(self) -> t.Optional[str]:
+        return self._name
+
+    @ap.async_property
+    async def topic(self) -> t.Optional[str]:
+        return self._topic
+
+    @ap.async_property
+    async def users(self) -> t.List[User]:
+        return self._users if self._users is not None else []
+
+
+class StaticMessage(Message):
+    """
+    A :class:`~royalnet.engineer.bullet.contents.message.Message` whose data is already known.
+    """
+
+    __slots__ = ("id", "_text", "_timestamp", "_reply_to", "_channel", "_sender", "_files", "__weakref__")
+
+    def __init__(self,
+                 id_: t.Hashable,
+                 *,
+                 text: t.Optional[str] = None,
+                 timestamp: t.Optional[datetime.datetime] = None,
+                 reply_to: t.Optional[Message] = None,
+                 channel: t.Optional[Channel] = None,
+                 sender: t.Optional[User] = None,
+                 files: t.Optional[t.List[t.BinaryIO]] = None):
+        super().__init__()
+        self.id: t.Hashable = id_
+        self._text: t.Optional[str] = text
+        self._timestamp: t.Optional[datetime.datetime] = timestamp
+        self._reply_to: t.Optional[Message] = reply_to
+        self._channel: t.Optional[Channel] = channel
+        self._sender: t.Optional[User] = sender
+        self._files: t.Optional[t.List[t.BinaryIO]] = files
+
+    def __hash__(self) -> int:
+        return hash(self.id)
+
+    def __repr__(self):
+        return f"<{self.__class__.__qualname__} {self.id!r}>"
+
+    @ap.async_property
+    async def text(self) -> t.Optional[str]:
+        return self._text
+
+    @ap.async_property
+    async def timestamp(self) -> t.Optional[datetime.datetime]:
+        return self._timestamp
+
+    @ap.async_property
+    async def reply_to(self) -> t.Optional[Message]:
+        return self._reply_to
+
+    @ap.async_property
+    async def channel(self) -> t.Optional[Channel]:
+        return self._channel
+
+    @ap.async_property
+    async def sender(self) -> t.Optional[User]:
+        return self._sender
+
+    @ap.async_property
+    async def files(self) -> t.Optional[t.List[t.BinaryIO]]:
+        return self._files
+
+
+class StaticMessageReceived(MessageReceived):
+    """
+    A :class:`~royalnet.engineer.bullet.projectiles.message.MessageReceived` of a message which is already known.
+    """
+
+    __slots__ = ("_message", "__weakref__")
+
+    def __init__(self, message: Message):
+        super().__init__()
+        self._message: Message = message
+
+    def __hash__(self) -> int:
+        return hash(self._message)
+
+    def __repr__(self):
+        return f"<{self.__class__.__qualname__} of {self._message!r}>"
+
+    @ap.async_property
+    async def message(self) -> Message:
+        return self._message
+
+
+__all__ = (
+    "StaticChannel",
+    "StaticMessage",
+    "StaticMessageReceived",
+    "StaticUser",
+)
@@ -8,7 +8,6 @@ from __future__ import annotations
 import abc
 import logging
 
-import royalnet.engineer.teleporter as tp
 import royalnet.royaltyping as t
 
 log = logging.getLogger(__name__)
@@ -42,7 +41,7 @@ class Conversation:
         raise NotImplementedError()
 
     def __call__(self, **kwargs) -> t.Awaitable[None]:
-        log.debug(f"{self}: Called")
+        log.debug("%s: Called", self)
         return self.run(**kwargs)
 
     def __repr__(self):
@@ -84,6 +83,9 @@ class TeleportingConversation(DecoratingConversation):
     """
 
     def __init__(self, function: t.ConversationProtocol):
+        # Imported here, as it requires pydantic, which conversations that aren't teleporting don't need
+        import royalnet.engineer.teleporter as tp
+
         super().__init__(tp.Teleporter(function, validate_output=False))
 
         self.bare_function = function
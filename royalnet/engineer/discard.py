@@ -1,5 +1,5 @@
 """
-This module contains the :class:`.Discard` special exception.
+This module contains the :class:`.Discard` special exception and the :data:`.DISCARD` sentinel.
 """
 
 
@@ -27,6 +27,29 @@ class Discard(BaseException):
         return f"Discarded {self.obj}: {self.message}"
 
 
+class _Discarded:
+    """
+    The type of :data:`.DISCARD`.
+    """
+
+    __slots__ = ()
+
+    def __repr__(self):
+        return "DISCARD"
+
+    def __bool__(self):
+        return False
+
+
+DISCARD = _Discarded()
+"""
+A sentinel which can be returned by :class:`~royalnet.engineer.wrench.Wrench`\\ es instead of raising
+:exc:`.Discard`, allowing :class:`~royalnet.engineer.sentry.Sentry` pipelines to skip an object without paying for
+an exception.
+"""
+
+
 __all__ = (
     "Discard",
+    "DISCARD",
 )
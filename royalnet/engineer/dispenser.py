@@ -4,13 +4,15 @@ This module contains the :class:`.Dispenser` class.
 
 from __future__ import annotations
 
+import asyncio
 import contextlib
 import logging
 
 import royalnet.royaltyping as t
+from royalnet.tracing import tracer
 from .bullet.projectiles import Projectile
 from .exc import EngineerException
-from .sentry import SentrySource
+from .sentry import OverflowPolicy, SentrySource
 
 log = logging.getLogger(__name__)
 
@@ -40,12 +42,34 @@ class Dispenser:
     They usually represent a single "conversation channel" with the bot: either a chat channel, or an user.
     """
 
-    def __init__(self):
+    def __init__(self, overflow: OverflowPolicy = OverflowPolicy.SPILL):
+        self.overflow: OverflowPolicy = overflow
+        """
+        The default :class:`~royalnet.engineer.sentry.OverflowPolicy` of the sentries created by this dispenser.
+
+        With the default :attr:`~royalnet.engineer.sentry.OverflowPolicy.SPILL`, :meth:`.put` never waits for a
+        sentry; with :attr:`~royalnet.engineer.sentry.OverflowPolicy.BLOCK`, it waits for the slowest of the sentries
+        with a full queue, applying backpressure to the implementation instead of buffering the items.
+        """
+
+        self.dropped: int = 0
+        """
+        The number of items dropped by the sentries of this dispenser because of their
+        :class:`~royalnet.engineer.sentry.OverflowPolicy`.
+        """
+
         self.sentries: t.List[SentrySource] = []
         """
         A :class:`list` of all the running sentries of this dispenser.
         """
 
+        self._index: t.Dict[t.Type, t.List[SentrySource]] = {}
+        """
+        A cache mapping projectile types to the :attr:`.sentries` subscribed to them.
+
+        .. seealso:: :meth:`.SentrySource.subscribe`
+        """
+
         self.locked_by: t.List[t.ConversationProtocol] = []
         """
         The conversation that is currently locking this dispenser.
@@ -53,16 +77,90 @@ class Dispenser:
         .. seealso:: :meth:`.lock`
         """
 
-    async def put(self, item: Projectile) -> None:
+        self._receipts: t.Dict[int, list] = {}
+        """
+        A :class:`dict` mapping the :func:`id` of the items put with an ``on_delivered`` callback to a
+        ``[undelivered, callbacks]`` pair, where ``undelivered`` is the number of sentries which haven't delivered the
+        item yet.
+
+        .. seealso:: :meth:`.delivered`
+        """
+
+    async def put(self, item: Projectile, on_delivered: t.Optional[t.Callable[[], t.Any]] = None) -> None:
         """
         Insert a new :class:`~royalnet.engineer.bullet.projectiles._base.Projectile` in the queues of all the
         running :attr:`.sentries`.
 
+        Items are put in all the queues without blocking first; then, the sentries with a full queue and a
+        :attr:`~royalnet.engineer.sentry.OverflowPolicy.BLOCK` policy are waited on concurrently, so that a single
+        slow sentry does not delay the delivery to the others, but only the return of this method.
+
         :param item: The :class:`~royalnet.engineer.bullet.projectiles._base.Projectile` to insert.
+        :param on_delivered: A function to call once every sentry the item was put in has either returned it or
+                             dropped it, or has been removed while still holding it.
+        """
+        with tracer.span("dispenser.put", dispenser=self, projectile=item) as span:
+            log.debug("Putting %r...", item)
+            subscribers = self.subscribers(type(item))
+            if on_delivered is not None:
+                self._expect(item, len(subscribers), on_delivered)
+            blocked = [sentry for sentry in subscribers if not sentry.put_nowait(item)]
+            span.set(sentries=len(subscribers), blocked=len(blocked))
+            if blocked:
+                log.debug("Waiting for %d full sentries...", len(blocked))
+                with tracer.span("sentry.put", dispenser=self, projectile=item, sentries=blocked):
+                    await asyncio.gather(*[sentry.put(item) for sentry in blocked])
+
+    def _expect(self, item: Projectile, count: int, callback: t.Callable[[], t.Any]) -> None:
+        """
+        Start waiting for an item to be :meth:`.delivered` by the given number of sentries.
+
+        :param item: The item.
+        :param count: The number of sentries the item is about to be put in.
+        :param callback: The function to call once all of them have delivered it.
         """
-        log.debug(f"Putting {item!r}...")
-        for sentry in self.sentries:
-            await sentry.put(item)
+        if not count:
+            callback()
+        elif (receipt := self._receipts.get(id(item))) is not None:
+            receipt[0] += count
+            receipt[1].append(callback)
+        else:
+            self._receipts[id(item)] = [count, [callback]]
+
+    def delivered(self, item: Projectile) -> None:
+        """
+        Called by the sentries every time an item leaves their queue, either because it was returned or because it
+        was dropped; calls the ``on_delivered`` callbacks of the item passed to :meth:`.put` once all the sentries
+        have delivered it.
+
+        :param item: The item which left the queue.
+        """
+        if not self._receipts or (receipt := self._receipts.get(id(item))) is None:
+            return
+        receipt[0] -= 1
+        if receipt[0] <= 0:
+            del self._receipts[id(item)]
+            for callback in receipt[1]:
+                callback()
+
+    def subscribers(self, type_: t.Type) -> t.List[SentrySource]:
+        """
+        Get the :attr:`.sentries` subscribed to projectiles of the given type, caching the result until
+        :meth:`.reindex` is called.
+
+        :param type_: The type of the projectile.
+        :return: The :class:`list` of subscribed sentries.
+        """
+        if (subscribers := self._index.get(type_)) is None:
+            subscribers = self._index[type_] = [sentry for sentry in self.sentries if sentry.accepts(type_)]
+        return subscribers
+
+    def reindex(self) -> None:
+        """
+        Clear the cache of :meth:`.subscribers`; called every time a sentry is added, removed or changes its
+        subscriptions.
+        """
+        self._index.clear()
 
     @contextlib.contextmanager
     def sentry(self, *args, **kwargs):
@@ -71,16 +169,51 @@ class Dispenser:
         while it is being used.
         """
         log.debug("Creating a new SentrySource...")
-        sentry = SentrySource(dispenser=self, *args, **kwargs)
+        kwargs.setdefault("overflow", self.overflow)
+        sentry = SentrySource(self, *args, **kwargs)
 
-        log.debug(f"Adding: {sentry!r}")
+        log.debug("Adding: %r", sentry)
         self.sentries.append(sentry)
+        self.reindex()
+
+        try:
+            log.debug("Yielding: %r", sentry)
+            yield sentry
+        finally:
+            if sentry in self.sentries:
+                log.debug("Removing from the sentries list: %r", sentry)
+                self.sentries.remove(sentry)
+                self.reindex()
+            # The items left in the queue of a finished or cancelled conversation will never be returned, so they
+            # are considered delivered
+            self._release(sentry)
+            sentry.close()
+
+    def detach(self, sentry: SentrySource) -> None:
+        """
+        Stop putting items in one of the :attr:`.sentries` before its conversation ends, considering the items left in
+        its queue delivered.
 
-        log.debug(f"Yielding: {sentry!r}")
-        yield sentry
+        :param sentry: The :class:`.SentrySource` to detach.
+        """
+        if sentry in self.sentries:
+            log.debug("Detaching: %r", sentry)
+            self.sentries.remove(sentry)
+            self.reindex()
+        self._release(sentry)
+        sentry.close()
 
-        log.debug(f"Removing from the sentries list: {sentry!r}")
-        self.sentries.remove(sentry)
+    def _release(self, sentry: SentrySource) -> None:
+        """
+        Consider the items left in the queue of a removed sentry, including the ones of the :meth:`.put`\\ s blocked on
+        it, :meth:`.delivered`, as they will never be returned.
+
+        :param sentry: The removed :class:`.SentrySource`.
+        """
+        if sentry.closed:
+            return
+        while (self._receipts or sentry.blocked) and not sentry.queue.empty():
+            sentry.get_nowait()
 
     async def run(self, conv: t.ConversationProtocol, **kwargs) -> None:
         """
@@ -89,14 +222,14 @@ class Dispenser:
         :param conv: The :class:`~royalnet.engineer.conversation.Conversation` to run.
         :raises .LockedDispenserError: If the dispenser is currently :attr:`.locked_by` a :class:`.Conversation`.
         """
-        log.debug(f"Trying to run: {conv!r}")
+        log.debug("Trying to run: %r", conv)
 
         if self.locked_by:
-            log.debug(f"Dispenser is locked by {self.locked_by!r}, refusing to run {conv!r}")
+            log.debug("Dispenser is locked by %r, refusing to run %r", self.locked_by, conv)
             raise LockedDispenserError(
                 f"The Dispenser is currently locked and cannot start any new Conversation.", self.locked_by)
 
-        log.debug(f"Running: {conv!r}")
+        log.debug("Running: %r", conv)
         with self.sentry() as sentry:
             await conv(_sentry=sentry, **kwargs)
 
@@ -112,13 +245,13 @@ class Dispenser:
 
         .. seealso:: :attr:`.locked_by`
         """
-        log.debug(f"Adding lock: {conv!r}")
+        log.debug("Adding lock: %r", conv)
         self.locked_by.append(conv)
 
         try:
             yield
         finally:
-            log.debug(f"Clearing lock: {conv!r}")
+            log.debug("Clearing lock: %r", conv)
             self.locked_by.remove(conv)
 
 
@@ -0,0 +1,439 @@
+"""
+This module contains a small metrics registry, which keeps counters, gauges and histograms about the objects of
+:mod:`royalnet.engineer`, and can export them in the
+`Prometheus text format <https://prometheus.io/docs/instrumenting/exposition_formats/>`_.
+
+.. code-block::
+
+   text = default_registry.export()
+   server = await default_registry.serve(port=9090)
+"""
+
+from __future__ import annotations
+
+import abc
+import array
+import asyncio
+import bisect
+import logging
+import weakref
+
+import royalnet.royaltyping as t
+
+if t.TYPE_CHECKING:
+    from .pda.implementations.base import ConversationListImplementation
+
+log = logging.getLogger(__name__)
+
+Labels = t.Tuple[str, ...]
+
+DEFAULT_BUCKETS: t.Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+"""
+The default upper bounds of the buckets of a :class:`.Histogram`, in seconds.
+"""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: t.Sequence[str], values: t.Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class Metric(metaclass=abc.ABCMeta):
+    """
+    The base class for the metrics of a :class:`.MetricsRegistry`.
+    """
+
+    type: str = "untyped"
+    """
+    The Prometheus type of the metric.
+    """
+
+    def __init__(self, name: str, documentation: str, labels: t.Sequence[str] = ()):
+        self.name: str = name
+        """
+        The name of the metric.
+        """
+
+        self.documentation: str = documentation
+        """
+        A description of the metric, exported as its ``HELP``.
+        """
+
+        self.labels: Labels = tuple(labels)
+        """
+        The names of the labels of the metric; values must be passed in the same order.
+        """
+
+    def __repr__(self):
+        return f"<{self.__class__.__qualname__} {self.name}>"
+
+    @abc.abstractmethod
+    def samples(self) -> t.Iterable[t.Tuple[str, Labels, Labels, float]]:
+        """
+        :return: An iterable of ``(name, label names, label values, value)`` tuples, one for each exported sample.
+        """
+        raise NotImplementedError()
+
+    def export(self) -> str:
+        """
+        :return: The metric in the Prometheus text format.
+        """
+        lines = [
+            f"# HELP {self.name} {_escape(self.documentation)}",
+            f"# TYPE {self.name} {self.type}",
+        ]
+        for name, label_names, label_values, value in self.samples():
+            lines.append(f"{name}{_format_labels(label_names, label_values)} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    """
+    A :class:`.Metric` which can only increase.
+    """
+
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: t.Sequence[str] = ()):
+        super().__init__(name=name, documentation=documentation, labels=labels)
+
+        self.values: dict[Labels, float] = {}
+        """
+        A :class:`dict` mapping label values to the value of the counter.
+        """
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        """
+        Increase the counter.
+
+        :param labels: The label values.
+        :param amount: How much to increase the counter by.
+        """
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def get(self, *labels: str) -> float:
+        """
+        :param labels: The label values.
+        :return: The current value of the counter.
+        """
+        return self.values.get(labels, 0)
+
+    def samples(self):
+        for labels, value in self.values.items():
+            yield self.name, self.labels, labels, value
+
+
+class Gauge(Metric):
+    """
+    A :class:`.Metric` which can go up and down.
+
+    Instead of being set, its values can be computed every time the metric is exported by a ``function``, which costs
+    nothing until then.
+    """
+
+    type = "gauge"
+
+    def __init__(self,
+                 name: str,
+                 documentation: str,
+                 labels: t.Sequence[str] = (),
+                 function: t.Optional[t.Callable[[], t.Iterable[t.Tuple[Labels, float]]]] = None):
+        super().__init__(name=name, documentation=documentation, labels=labels)
+
+        self.values: dict[Labels, float] = {}
+        """
+        A :class:`dict` mapping label values to the value of the gauge.
+        """
+
+        self.function: t.Optional[t.Callable[[], t.Iterable[t.Tuple[Labels, float]]]] = function
+        """
+        A function returning ``(label values, value)`` pairs, used instead of :attr:`.values` if it is not
+        :data:`None`.
+        """
+
+    def set(self, *labels: str, value: float) -> None:
+        """
+        Set the value of the gauge.
+
+        :param labels: The label values.
+        :param value: The new value.
+        """
+        self.values[labels] = value
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        """
+        Increase the gauge.
+
+        :param labels: The label values.
+        :param amount: How much to increase the gauge by; can be negative.
+        """
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def samples(self):
+        values = self.function() if self.function is not None else self.values.items()
+        for labels, value in values:
+            yield self.name, self.labels, labels, value
+
+
+class Histogram(Metric):
+    """
+    A :class:`.Metric` counting observations in buckets.
+
+    The counts of each set of label values are stored in a single :class:`array.array` of unsigned integers, with one
+    item for each bucket.
+    """
+
+    type = "histogram"
+
+    def __init__(self,
+                 name: str,
+                 documentation: str,
+                 labels: t.Sequence[str] = (),
+                 buckets: t.Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name=name, documentation=documentation, labels=labels)
+
+        self.buckets: t.Tuple[float, ...] = tuple(sorted(buckets))
+        """
+        The upper bounds of the buckets, excluding the implicit ``+Inf`` one.
+        """
+
+        self.counts: dict[Labels, array.array] = {}
+        """
+        A :class:`dict` mapping label values to the non-cumulative counts of each bucket, ``+Inf`` included.
+        """
+
+        self.sums: dict[Labels, float] = {}
+        """
+        A :class:`dict` mapping label values to the sum of all the observed values.
+        """
+
+    def observe(self, *labels: str, value: float) -> None:
+        """
+        Record an observation.
+
+        :param labels: The label values.
+        :param value: The observed value.
+        """
+        if (counts := self.counts.get(labels)) is None:
+            counts = self.counts[labels] = array.array("Q", bytes(8 * (len(self.buckets) + 1)))
+            self.sums[labels] = 0.0
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sums[labels] += value
+
+    def samples(self):
+        label_names = self.labels + ("le",)
+        for labels, counts in self.counts.items():
+            total = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                total += count
+                yield f"{self.name}_bucket", label_names, labels + (_format_value(bound),), total
+            yield f"{self.name}_sum", self.labels, labels, self.sums[labels]
+            yield f"{self.name}_count", self.labels, labels, total
+
+
+class MetricsRegistry:
+    """
+    A collection of :class:`.Metric`\\ s which can be exported together.
+    """
+
+    def __init__(self):
+        self.metrics: dict[str, Metric] = {}
+        """
+        A :class:`dict` mapping names to the registered metrics.
+        """
+
+    def __repr__(self):
+        return f"<{self.__class__.__qualname__} of {len(self.metrics)} metrics>"
+
+    def register(self, metric: Metric) -> Metric:
+        """
+        Add a metric to the registry.
+
+        :param metric: The metric to add.
+        :return: The added metric.
+        :raises ValueError: If a metric with the same name is already registered.
+        """
+        if metric.name in self.metrics:
+            raise ValueError(f"A metric named {metric.name!r} is already registered")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labels: t.Sequence[str] = ()) -> Counter:
+        """
+        Create and :meth:`.register` a :class:`.Counter`.
+        """
+        return self.register(Counter(name, documentation, labels))
+
+    def gauge(self, name: str, documentation: str, labels: t.Sequence[str] = (), function=None) -> Gauge:
+        """
+        Create and :meth:`.register` a :class:`.Gauge`.
+        """
+        return self.register(Gauge(name, documentation, labels, function))
+
+    def histogram(self, name: str, documentation: str, labels: t.Sequence[str] = (),
+                  buckets: t.Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        """
+        Create and :meth:`.register` a :class:`.Histogram`.
+        """
+        return self.register(Histogram(name, documentation, labels, buckets))
+
+    def export(self) -> str:
+        """
+        :return: All the registered metrics in the Prometheus text format.
+        """
+        return "".join(f"{metric.export()}\n" for metric in self.metrics.values())
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            await reader.readuntil(b"\r\n\r\n")
+            body = self.export().encode("utf-8")
+            writer.write(
+                b"HTTP/1.0 200 OK\r\n"
+                b"Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                b"Content-Length: " + str(len(body)).encode("ascii") + b"\r\n"
+                b"\r\n" + body
+            )
+            await writer.drain()
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError) as e:
+            log.debug("Failed to serve metrics: %r", e)
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 9090) -> asyncio.AbstractServer:
+        """
+        Start a minimal HTTP server answering every request with :meth:`.export`, so that the metrics can be scraped
+        by Prometheus.
+
+        :param host: The address to listen on.
+        :param port: The port to listen on.
+        :return: The started :class:`asyncio.AbstractServer`; close it to stop serving.
+        """
+        log.info(f"Serving metrics on {host}:{port}")
+        return await asyncio.start_server(self._handle, host, port)
+
+
+default_registry = MetricsRegistry()
+"""
+The :class:`.MetricsRegistry` containing the metrics of :mod:`royalnet.engineer`.
+"""
+
+implementations: "weakref.WeakSet[ConversationListImplementation]" = weakref.WeakSet()
+"""
+The :class:`~royalnet.engineer.pda.implementations.base.ConversationListImplementation`\\ s whose dispensers and
+sentries are reported by the gauges of :data:`.default_registry`.
+"""
+
+
+def _dispensers():
+    for implementation in implementations:
+        yield (implementation.name,), len(implementation.dispensers)
+
+
+def _sentries():
+    for implementation in implementations:
+        yield (implementation.name,), sum(len(d.sentries) for d in implementation.dispensers.values())
+
+
+def _queued():
+    for implementation in implementations:
+        yield (implementation.name,), sum(
+            sentry.queue.qsize() + len(sentry.spill)
+            for dispenser in implementation.dispensers.values()
+            for sentry in dispenser.sentries
+        )
+
+
+projectiles = default_registry.counter(
+    "royalnet_projectiles_total",
+    "Projectiles put in the dispensers of a PDA implementation.",
+    ("implementation",),
+)
+
+dispensers = default_registry.gauge(
+    "royalnet_dispensers",
+    "Dispensers currently kept by a PDA implementation.",
+    ("implementation",),
+    _dispensers,
+)
+
+sentries = default_registry.gauge(
+    "royalnet_sentries",
+    "Sentries currently running in the dispensers of a PDA implementation.",
+    ("implementation",),
+    _sentries,
+)
+
+queued = default_registry.gauge(
+    "royalnet_sentry_queued_projectiles",
+    "Projectiles waiting in the queues of the sentries of a PDA implementation.",
+    ("implementation",),
+    _queued,
+)
+
+discards = default_registry.counter(
+    "royalnet_discards_total",
+    "Objects discarded by a wrench.",
+    ("wrench",),
+)
+
+conversations_started = default_registry.counter(
+    "royalnet_conversations_started_total",
+    "Conversations started by a PDA implementation.",
+    ("implementation",),
+)
+
+conversations_finished = default_registry.counter(
+    "royalnet_conversations_finished_total",
+    "Conversations of a PDA implementation which returned without raising.",
+    ("implementation",),
+)
+
+conversations_failed = default_registry.counter(
+    "royalnet_conversations_failed_total",
+    "Conversations of a PDA implementation which raised an unhandled exception.",
+    ("implementation",),
+)
+
+conversations_cancelled = default_registry.counter(
+    "royalnet_conversations_cancelled_total",
+    "Conversations of a PDA implementation which were cancelled before returning.",
+    ("implementation",),
+)
+
+conversation_seconds = default_registry.histogram(
+    "royalnet_conversation_seconds",
+    "How long the conversations of a PDA implementation ran for.",
+    ("implementation",),
+)
+
+
+def wrench_name(stage: t.Callable) -> str:
+    """
+    :param stage: A :func:`~royalnet.engineer.wrench.stage` function or a bound method of a wrench.
+    :return: The name to use as the ``wrench`` label of :data:`.discards`.
+    """
+    owner = getattr(stage, "__self__", stage)
+    return getattr(owner, "__qualname__", None) or owner.__class__.__qualname__
+
+
+__all__ = (
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "Metric",
+    "MetricsRegistry",
+    "default_registry",
+)
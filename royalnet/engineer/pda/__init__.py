@@ -1,2 +1,5 @@
 from .base import *
 from .implementations import *
+from .monitor import *
+from .recording import *
+from .journal import *
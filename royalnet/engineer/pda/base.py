@@ -6,6 +6,7 @@ import asyncio
 import logging
 
 import royalnet.royaltyping as t
+from royalnet.engineer.pda.monitor import LagMonitor
 
 if t.TYPE_CHECKING:
     from royalnet.engineer.pda.implementations.base import PDAImplementation
@@ -20,7 +21,21 @@ class PDA:
     .. todo:: Document this.
     """
 
-    def __init__(self, implementations: list["PDAImplementation"]):
+    def __init__(self,
+                 implementations: list["PDAImplementation"],
+                 lag_monitor: t.Optional[LagMonitor] = None,
+                 monitor_lag: bool = True):
+        self.lag_monitor: t.Optional[LagMonitor] = None
+        """
+        The :class:`.LagMonitor` measuring the event loop lag while the PDA is running, or :data:`None` if
+        ``monitor_lag`` is :data:`False`; if ``lag_monitor`` isn't specified, a default one is created.
+
+        Set it to :data:`None` to disable lag monitoring.
+        """
+
+        if monitor_lag:
+            self.lag_monitor = lag_monitor if lag_monitor is not None else LagMonitor()
+
         self.implementations: dict[str, "PDAImplementation"] = {}
         for implementation in implementations:
             implementation.bind(pda=self)
@@ -33,16 +48,55 @@ class PDA:
         return len(self.implementations)
 
     async def _run(self):
+        monitor = None
+        if self.lag_monitor is not None:
+            log.debug("Starting lag monitor...")
+            monitor = asyncio.create_task(self.lag_monitor.run())
+
         log.info("Running all implementations...")
-        await asyncio.gather(*[implementation.run() for implementation in self.implementations.values()])
+        try:
+            await asyncio.gather(*[implementation.run() for implementation in self.implementations.values()])
+        finally:
+            if monitor:
+                log.debug("Stopping lag monitor...")
+                monitor.cancel()
+                try:
+                    await monitor
+                except asyncio.CancelledError:
+                    pass
         log.fatal("All implementations have finished running?!")
 
-    def run(self):
-        log.debug("Getting event loop...")
-        loop = asyncio.get_event_loop()
-        log.debug("Running blockingly all implementations...")
-        loop.run_until_complete(self._run())
-        log.fatal("Blocking call has finished?!")
+    @staticmethod
+    def default_loop_factory() -> t.Callable[[], asyncio.AbstractEventLoop]:
+        """
+        :return: :func:`uvloop.new_event_loop` if :mod:`uvloop` is installed, :func:`asyncio.new_event_loop`
+                 otherwise.
+        """
+        try:
+            import uvloop
+        except ImportError:
+            return asyncio.new_event_loop
+        else:
+            return uvloop.new_event_loop
+
+    def run(self, loop_factory: t.Optional[t.Callable[[], asyncio.AbstractEventLoop]] = None):
+        """
+        Run all the implementations in a new event loop, blocking until they are finished.
+
+        :param loop_factory: A function returning the event loop to use; if :data:`None`,
+                             :meth:`.default_loop_factory` is used.
+        """
+        log.debug("Creating event loop...")
+        loop = (loop_factory or self.default_loop_factory())()
+        asyncio.set_event_loop(loop)
+        try:
+            log.debug("Running blockingly all implementations...")
+            loop.run_until_complete(self._run())
+            log.fatal("Blocking call has finished?!")
+        finally:
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            asyncio.set_event_loop(None)
+            loop.close()
 
 
 __all__ = (
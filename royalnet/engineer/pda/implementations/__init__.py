@@ -3,3 +3,4 @@
 """
 
 from .base import *
+from .sharded import *
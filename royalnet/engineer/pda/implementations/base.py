@@ -5,22 +5,41 @@ This module contains the base :class:`.PDAImplementation` and its basic implemen
 
 import abc
 import asyncio
+import collections
+import functools
 import logging
 import sys
+import time
 import traceback
 import types
 
 import royalnet.exc as exc
 import royalnet.royaltyping as t
+from royalnet.engineer import discard
+from royalnet.engineer import metrics
+from royalnet.engineer import wrench
+from royalnet.engineer.bullet import cache
+from royalnet.engineer.bullet.identity import IdentityMap
 from royalnet.engineer.dispenser import Dispenser
+from royalnet.engineer.sentry import OverflowPolicy
+from royalnet.tracing import tracer
 
 if t.TYPE_CHECKING:
     from royalnet.engineer.pda.base import PDA
+    from royalnet.engineer.pda.journal import Journal
     from royalnet.engineer.bullet.projectiles import Projectile
 
 DispenserKey = t.Hashable
 
 
+def _call_all(*functions: t.Callable[[], t.Any]) -> None:
+    """
+    Call all the given functions in order.
+    """
+    for function in functions:
+        function()
+
+
 class PDAImplementation(metaclass=abc.ABCMeta):
     """
     An abstract class describing the interface of a PDA implementation.
@@ -47,6 +66,12 @@ class PDAImplementation(metaclass=abc.ABCMeta):
         The :class:`logging.Logger` that is being used by this PDA implementation.
         """
 
+        self.identities: IdentityMap = IdentityMap()
+        """
+        The :class:`~royalnet.engineer.bullet.identity.IdentityMap` this PDA implementation should use to get the
+        canonical instance of the :class:`~royalnet.engineer.bullet.casing.Casing`\\ s it creates.
+        """
+
     def __repr__(self):
         return f"<PDAImplementation {self.name}>"
 
@@ -108,9 +133,57 @@ class ConversationListImplementation(PDAImplementation, metaclass=abc.ABCMeta):
     :class:`~royalnet.engineer.dispenser.Dispenser` .
     """
 
-    def __init__(self, name: str):
+    def __init__(self,
+                 name: str,
+                 max_dispensers: t.Optional[int] = None,
+                 dispenser_ttl: t.Optional[float] = None,
+                 journal: t.Optional["Journal"] = None,
+                 overflow: OverflowPolicy = OverflowPolicy.SPILL):
         super().__init__(name=name)
 
+        self.max_dispensers: t.Optional[int] = max_dispensers
+        """
+        The maximum number of idle :class:`~royalnet.engineer.dispenser.Dispenser`\\ s to keep in :attr:`.dispensers`
+        before evicting the least recently used ones, or :data:`None` to keep all of them.
+
+        .. seealso:: :meth:`._evict_dispensers`
+        """
+
+        self.dispenser_ttl: t.Optional[float] = dispenser_ttl
+        """
+        The number of seconds after which an idle :class:`~royalnet.engineer.dispenser.Dispenser` that hasn't been
+        used is evicted from :attr:`.dispensers`, or :data:`None` to never evict them.
+
+        .. seealso:: :meth:`._evict_dispensers`
+        """
+
+        self.overflow: OverflowPolicy = overflow
+        """
+        The :class:`~royalnet.engineer.sentry.OverflowPolicy` of the :class:`~royalnet.engineer.dispenser.Dispenser`\\ s
+        created by :meth:`._create_dispenser`.
+        """
+
+        self.dispenser_hits: int = 0
+        """
+        The number of times :meth:`.get_or_create_dispenser` found an existing dispenser.
+        """
+
+        self.dispenser_misses: int = 0
+        """
+        The number of times :meth:`.get_or_create_dispenser` had to create a new dispenser.
+        """
+
+        self.dispenser_evictions: int = 0
+        """
+        The number of dispensers evicted by :meth:`._evict_dispensers`.
+        """
+
+        self._dispensers_used: dict[DispenserKey, float] = {}
+        """
+        A :class:`dict` mapping the keys of :attr:`.dispensers` to the :func:`time.monotonic` time they were last used
+        at.
+        """
+
         self.conversations: list[t.ConversationProtocol] = self._create_conversations()
         """
         A :class:`list` of :class:`~royalnet.engi.conversation.Conversation`\\ s that should be run before 
@@ -118,11 +191,46 @@ class ConversationListImplementation(PDAImplementation, metaclass=abc.ABCMeta):
         :class:`~royalnet.engineer.dispenser.Dispenser` .
         """
 
-        self.dispensers: dict[DispenserKey, "Dispenser"] = self._create_dispensers()
+        self.dispensers: collections.OrderedDict[DispenserKey, "Dispenser"] = self._create_dispensers()
         """
-        A :class:`dict` which maps :func:`hash`\\ able objects to a :class:`~royalnet.engineer.dispenser.Dispenser` .
+        A :class:`collections.OrderedDict` which maps :func:`hash`\\ able objects to a
+        :class:`~royalnet.engineer.dispenser.Dispenser` , from the least recently used to the most recently used.
         """
 
+        if not isinstance(self.dispensers, collections.OrderedDict):
+            self.dispensers = collections.OrderedDict(self.dispensers)
+
+        self.triggers: dict[t.ConversationProtocol, tuple[tuple[t.Callable[[t.Any], t.Any], bool], ...]] = {}
+        """
+        A :class:`dict` which maps :class:`~royalnet.engineer.conversation.Conversation`\\ s to the
+        :func:`~royalnet.engineer.wrench.stage`\\ s of the trigger they were registered with.
+
+        .. seealso:: :meth:`.register_conversation`
+        """
+
+        self.taps: list[t.Callable[[DispenserKey, "Projectile"], t.Any]] = []
+        """
+        A :class:`list` of functions called with the key and the
+        :class:`~royalnet.engineer.bullet.projectile.Projectile` every time one is :meth:`.put`, before it is handled,
+        such as a :class:`~royalnet.engineer.pda.recording.Recorder`.
+        """
+
+        self.journal: t.Optional["Journal"] = journal
+        """
+        The :class:`~royalnet.engineer.pda.journal.Journal` every
+        :class:`~royalnet.engineer.bullet.projectile.Projectile` is written to before being handled, and acknowledged
+        in once it has been delivered to all the conversations it was put in front of, or :data:`None` to not keep
+        one.
+
+        Projectiles are acknowledged as soon as the conversations receive them, not after they have been handled;
+        the ones left in the queues of the conversations which end or are cancelled are acknowledged too, unless the
+        journal has already been :meth:`~royalnet.engineer.pda.journal.Journal.close`\\ d.
+
+        .. seealso:: :meth:`.resume`
+        """
+
+        metrics.implementations.add(self)
+
     def _create_conversations(self) -> list[t.ConversationProtocol]:
         """
         Create the :attr:`.conversations` :class:`list` of the :class:`.ConversationListPDA`\\ .
@@ -133,15 +241,15 @@ class ConversationListImplementation(PDAImplementation, metaclass=abc.ABCMeta):
         self.log.debug(f"Creating conversations list...")
         return []
 
-    def _create_dispensers(self) -> dict[t.Any, "Dispenser"]:
+    def _create_dispensers(self) -> collections.OrderedDict[t.Any, "Dispenser"]:
         """
         Create the :attr:`.dispensers` dictionary of the PDA.
 
-        :return: The created :class:`dict`, empty by default.
+        :return: The created :class:`collections.OrderedDict`, empty by default; other mappings are converted to one.
         """
 
         self.log.debug(f"Creating dispensers list...")
-        return {}
+        return collections.OrderedDict()
 
     def get(self, key: DispenserKey) -> t.Optional["Dispenser"]:
         """
@@ -154,7 +262,7 @@ class ConversationListImplementation(PDAImplementation, metaclass=abc.ABCMeta):
         .. seealso:: :meth:`dict.get`
         """
 
-        self.log.debug(f"Getting dispenser with key: {key!r}")
+        self.log.debug("Getting dispenser with key: %r", key)
         return self.dispensers.get(key)
 
     def _create_dispenser(self) -> "Dispenser":
@@ -165,7 +273,7 @@ class ConversationListImplementation(PDAImplementation, metaclass=abc.ABCMeta):
         """
 
         self.log.debug(f"Creating new dispenser...")
-        return Dispenser()
+        return Dispenser(overflow=self.overflow)
 
     def get_or_create_dispenser(self, key: DispenserKey) -> "Dispenser":
         """
@@ -176,21 +284,71 @@ class ConversationListImplementation(PDAImplementation, metaclass=abc.ABCMeta):
         :return: The retrieved or created :class:`~royalnet.engineer.dispenser.Dispenser` .
         """
 
-        if key not in self.dispensers:
-            self.log.debug(f"{self!r}: Dispenser {key!r} does not exist, creating a new one...")
+        if key in self.dispensers:
+            self.dispenser_hits += 1
+            self.dispensers.move_to_end(key)
+        else:
+            self.dispenser_misses += 1
+            self.log.debug("%r: Dispenser %r does not exist, creating a new one...", self, key)
             self.dispensers[key] = self._create_dispenser()
+
+        now = time.monotonic()
+        self._dispensers_used[key] = now
+        self._evict_dispensers(now=now, keep=key)
+
         return self.get(key=key)
 
-    def register_conversation(self, conversation: t.ConversationProtocol) -> None:
+    def _evict_dispensers(self, now: float, keep: DispenserKey) -> None:
+        """
+        Evict the least recently used :attr:`.dispensers` while there are more than :attr:`.max_dispensers` or while
+        they haven't been used for more than :attr:`.dispenser_ttl` seconds.
+
+        Dispensers which are still in use, having running sentries or being locked, are never evicted, and are
+        considered used ``now`` instead; as soon as one of them is found, the eviction stops until the next call, so
+        that all the dispensers aren't scanned every time while they are all in use.
+
+        :param now: The current :func:`time.monotonic` time.
+        :param keep: The key of a dispenser which should not be evicted, as it is about to be used.
+        """
+
+        while self.dispensers:
+            key = next(iter(self.dispensers))
+
+            over = self.max_dispensers is not None and len(self.dispensers) > self.max_dispensers
+            expired = self.dispenser_ttl is not None and now - self._dispensers_used.get(key, now) > self.dispenser_ttl
+            if not (over or expired):
+                break
+
+            dispenser = self.dispensers[key]
+            if key == keep or dispenser.sentries or dispenser.locked_by:
+                self.dispensers.move_to_end(key)
+                self._dispensers_used[key] = now
+                break
+
+            self.log.debug(f"Evicting idle dispenser: {key!r}")
+            del self.dispensers[key]
+            self._dispensers_used.pop(key, None)
+            self.dispenser_evictions += 1
+
+    def register_conversation(self,
+                              conversation: t.ConversationProtocol,
+                              trigger: t.Optional[t.Sequence[t.WrenchLike]] = None) -> None:
         """
         Register a new :class:`~royalnet.engineer.conversation.Conversation` to be run when a new
         :class:`~royalnet.engineer.bullet.projectile.Projectile` is :meth:`.put`\\ .
 
         :param conversation: The :class:`~royalnet.engineer.conversation.Conversation` to register.
+        :param trigger: A sequence of :class:`~royalnet.engineer.wrench.Wrench`\\ es that the
+                        :class:`~royalnet.engineer.bullet.projectile.Projectile` should pass through without being
+                        discarded for the :class:`~royalnet.engineer.conversation.Conversation` to be started, such as
+                        ``[wrench.MessageText(), wrench.StartsWith("/ping")]``;
+                        if :data:`None`, the conversation is started for every projectile.
         """
 
         self.log.debug(f"Registering: {conversation!r}")
         self.conversations.append(conversation)
+        if trigger:
+            self.triggers[conversation] = tuple(wrench.stage(w) for w in trigger)
 
     def unregister_conversation(self, conversation: t.ConversationProtocol) -> None:
         """
@@ -202,6 +360,50 @@ class ConversationListImplementation(PDAImplementation, metaclass=abc.ABCMeta):
 
         self.log.debug(f"Unregistering: {conversation!r}")
         self.conversations.remove(conversation)
+        self.triggers.pop(conversation, None)
+
+    async def _is_triggered(self, conversation: t.ConversationProtocol, projectile: "Projectile") -> bool:
+        """
+        Check if a :class:`~royalnet.engineer.bullet.projectile.Projectile` passes through the trigger of a
+        :class:`~royalnet.engineer.conversation.Conversation` without being discarded.
+
+        :param conversation: The :class:`~royalnet.engineer.conversation.Conversation` to check the trigger of.
+        :param projectile: The :class:`~royalnet.engineer.bullet.projectile.Projectile` to check.
+        :return: Whether the :class:`~royalnet.engineer.conversation.Conversation` should be started.
+        """
+
+        item = projectile
+        try:
+            for stage, synchronous in self.triggers[conversation]:
+                if (item := stage(item) if synchronous else await stage(item)) is discard.DISCARD:
+                    return False
+        except discard.Discard:
+            return False
+        except Exception:
+            self.log.exception("Trigger of %r failed on %r, not starting it", conversation, projectile)
+            return False
+        return True
+
+    def _is_triggered_sync(self, conversation: t.ConversationProtocol, projectile: "Projectile") -> bool:
+        """
+        The same as :meth:`._is_triggered`, for triggers whose stages are all synchronous.
+
+        :param conversation: The :class:`~royalnet.engineer.conversation.Conversation` to check the trigger of.
+        :param projectile: The :class:`~royalnet.engineer.bullet.projectile.Projectile` to check.
+        :return: Whether the :class:`~royalnet.engineer.conversation.Conversation` should be started.
+        """
+
+        item = projectile
+        try:
+            for stage, _ in self.triggers[conversation]:
+                if (item := stage(item)) is discard.DISCARD:
+                    return False
+        except discard.Discard:
+            return False
+        except Exception:
+            self.log.exception("Trigger of %r failed on %r, not starting it", conversation, projectile)
+            return False
+        return True
 
     async def _run_conversation(self, dispenser: "Dispenser", conv: t.ConversationProtocol) -> None:
         """
@@ -217,10 +419,19 @@ class ConversationListImplementation(PDAImplementation, metaclass=abc.ABCMeta):
         :param conv: The :class:`~royalnet.engineer.conversation.Conversation` to run.
         """
 
+        metrics.conversations_started.inc(self.name)
+        start = time.perf_counter()
         try:
-            self.log.debug(f"Running {conv!r} in {dispenser!r}...")
-            await dispenser.run(conv=conv, _conv=conv, _pda=self.bound_to, _imp=self)
+            self.log.debug("Running %r in %r...", conv, dispenser)
+            with tracer.span("conversation.run", implementation=self, dispenser=dispenser, conversation=conv):
+                await dispenser.run(conv=conv, _conv=conv, _pda=self.bound_to, _imp=self)
+        except asyncio.CancelledError:
+            metrics.conversations_cancelled.inc(self.name)
+            metrics.conversation_seconds.observe(self.name, value=time.perf_counter() - start)
+            raise
         except Exception:
+            metrics.conversations_failed.inc(self.name)
+            metrics.conversation_seconds.observe(self.name, value=time.perf_counter() - start)
             try:
                 await self._handle_conversation_exc(
                     dispenser,
@@ -229,6 +440,9 @@ class ConversationListImplementation(PDAImplementation, metaclass=abc.ABCMeta):
                 )
             except Exception as exception:
                 self.log.error(f"Failed to handle conversation exception: {exception!r}")
+        else:
+            metrics.conversations_finished.inc(self.name)
+            metrics.conversation_seconds.observe(self.name, value=time.perf_counter() - start)
 
     async def _handle_conversation_exc(
             self,
@@ -254,13 +468,18 @@ class ConversationListImplementation(PDAImplementation, metaclass=abc.ABCMeta):
         ]
         self.log.error("\n".join(msg))
 
-    async def _schedule_conversations(self, dispenser: "Dispenser") -> list[asyncio.Task]:
+    async def _schedule_conversations(self,
+                                      dispenser: "Dispenser",
+                                      projectile: t.Optional["Projectile"] = None) -> list[asyncio.Task]:
         """
         Schedule the execution of instance of all the :class:`~royalnet.engineer.conversation.Conversation`\\ s listed
         in :attr:`.conversations` in the specified :class:`~royalnet.engineer.dispenser.Dispenser`\\ .
 
         :param dispenser: The :class:`~royalnet.engineer.dispenser.Dispenser` to run the
                           :class:`~royalnet.engineer.conversation.Conversation`\\ s in.
+        :param projectile: The :class:`~royalnet.engineer.bullet.projectile.Projectile` which is about to be put in
+                           the :class:`~royalnet.engineer.dispenser.Dispenser`; if specified, conversations whose
+                           :attr:`.triggers` discard it are not started.
         :return: The :class:`list` of :class:`asyncio.Task`\\ s that were created.
 
         .. seealso:: :meth:`._run_conversation`
@@ -270,42 +489,140 @@ class ConversationListImplementation(PDAImplementation, metaclass=abc.ABCMeta):
             self.log.debug("Refusing to run new Conversations in a locked Dispenser")
             return []
 
-        self.log.info(f"Running in {dispenser!r} all conversations...")
+        with tracer.span("implementation.schedule", implementation=self, dispenser=dispenser) as span:
+            self.log.info("Running in %r all conversations...", dispenser)
+
+            # Synchronous triggers are checked immediately, while the asynchronous ones are awaited concurrently
+            triggered: list[t.Optional[bool]] = []
+            pending: list[t.ConversationProtocol] = []
+            conversations = list(self.conversations)
+            for conv in conversations:
+                if projectile is None or (stages := self.triggers.get(conv)) is None:
+                    triggered.append(True)
+                elif all(synchronous for _, synchronous in stages):
+                    triggered.append(self._is_triggered_sync(conv, projectile))
+                else:
+                    triggered.append(None)
+                    pending.append(conv)
+            if pending:
+                results = iter(await asyncio.gather(*[self._is_triggered(conv, projectile) for conv in pending]))
+                triggered = [next(results) if result is None else result for result in triggered]
+
+            tasks: list[asyncio.Task] = []
+            for conv, result in zip(conversations, triggered):
+                if not result:
+                    continue
+
+                self.log.debug("Creating task for: %r", conv)
+                task = asyncio.create_task(self._run_conversation(dispenser=dispenser, conv=conv))
+
+                tasks.append(task)
+
+            span.set(conversations=len(tasks))
+
+            self.log.debug("Running a event loop cycle...")
+            await asyncio.sleep(0)
+
+        self.log.info("Tasks created: %r", tasks)
+        return tasks
 
-        tasks: list[asyncio.Task] = []
-        for conv in self.conversations:
-            self.log.debug(f"Creating task for: {conv!r}")
-            task = asyncio.create_task(self._run_conversation(dispenser=dispenser, conv=conv))
+    async def put(self,
+                  key: DispenserKey,
+                  projectile: "Projectile",
+                  on_delivered: t.Optional[t.Callable[[], t.Any]] = None) -> None:
+        """
+        Put a :class:`~royalnet.engineer.bullet.projectile.Projectile` in the
+        :class:`~royalnet.engineer.dispenser.Dispenser` with the specified key.
 
-            tasks.append(task)
+        :param key: The key identifying the :class:`~royalnet.engineer.dispenser.Dispenser` among the other
+                    :attr:`.dispensers`.
+        :param projectile: The :class:`~royalnet.engineer.bullet.projectile.Projectile` to insert.
+        :param on_delivered: A function to call once the projectile has been delivered to all the conversations it
+                             was put in front of.
+
+        .. seealso:: :meth:`.Dispenser.put`
+        """
 
-        self.log.debug(f"Running a event loop cycle...")
-        await asyncio.sleep(0)
+        self._call_taps(key, projectile)
 
-        self.log.info(f"Tasks created: {tasks!r}")
-        return tasks
+        offset = self.journal.append(key, projectile) if self.journal is not None else None
+        await self._put(key=key, projectile=projectile, offset=offset, on_delivered=on_delivered)
 
-    async def put(self, key: DispenserKey, projectile: "Projectile") -> None:
+    def _call_taps(self, key: DispenserKey, projectile: "Projectile") -> None:
+        """
+        Call all the :attr:`.taps` with a :class:`~royalnet.engineer.bullet.projectile.Projectile`, logging the
+        exceptions they raise instead of propagating them.
+
+        :param key: The key identifying the :class:`~royalnet.engineer.dispenser.Dispenser` among the other
+                    :attr:`.dispensers`.
+        :param projectile: The :class:`~royalnet.engineer.bullet.projectile.Projectile` being put.
+        """
+
+        for tap in self.taps:
+            try:
+                tap(key, projectile)
+            except Exception:
+                self.log.exception("Tap %r failed on %r", tap, projectile)
+
+    async def resume(self) -> int:
+        """
+        Put again the projectiles of the :attr:`.journal` which were not delivered before the process stopped, in the
+        order they were originally :meth:`.put`\\ .
+
+        It should be called once, before the implementation starts receiving new projectiles.
+
+        :return: The number of resumed projectiles.
         """
-        Put a :class:`~royalnet.engineer.bullet.projectile.Projectile` in the
-        :class:`~royalnet.engineer.dispenser.Dispenser` with the specified key.
+
+        if self.journal is None:
+            return 0
+
+        count = 0
+        for offset, key, projectile in self.journal.pending():
+            await self._put(key=key, projectile=projectile, offset=offset)
+            count += 1
+        self.log.info("Resumed %d projectiles from %r", count, self.journal)
+        return count
+
+    async def _put(self,
+                   key: DispenserKey,
+                   projectile: "Projectile",
+                   offset: t.Optional[int] = None,
+                   on_delivered: t.Optional[t.Callable[[], t.Any]] = None) -> None:
+        """
+        Handle a :class:`~royalnet.engineer.bullet.projectile.Projectile`, running the triggered conversations and
+        putting it in the :class:`~royalnet.engineer.dispenser.Dispenser` with the specified key.
 
         :param key: The key identifying the :class:`~royalnet.engineer.dispenser.Dispenser` among the other
                     :attr:`.dispensers`.
         :param projectile: The :class:`~royalnet.engineer.bullet.projectile.Projectile` to insert.
+        :param offset: The offset of the projectile in the :attr:`.journal`, to acknowledge once it has been
+                       delivered, or :data:`None` if it isn't journaled.
+        :param on_delivered: A function to call once the projectile has been delivered.
         """
 
-        self.log.debug(f"Finding dispenser {key!r} to put {projectile!r} in...")
-        dispenser = self.get_or_create_dispenser(key=key)
+        metrics.projectiles.inc(self.name)
+
+        with tracer.span("implementation.put", implementation=self, key=key, projectile=projectile):
+            await cache.invalidate_related(projectile)
+
+            self.log.debug("Finding dispenser %r to put %r in...", key, projectile)
+            dispenser = self.get_or_create_dispenser(key=key)
 
-        self.log.debug(f"Running all conversations...")
-        await self._schedule_conversations(dispenser=dispenser)
+            self.log.debug("Running all conversations...")
+            await self._schedule_conversations(dispenser=dispenser, projectile=projectile)
 
-        self.log.debug(f"Putting {projectile!r} in {dispenser!r}...")
-        await dispenser.put(projectile)
+            self.log.debug("Putting %r in %r...", projectile, dispenser)
+            if offset is not None:
+                acknowledge = functools.partial(self.journal.acknowledge, offset)
+                if on_delivered is None:
+                    on_delivered = acknowledge
+                else:
+                    on_delivered = functools.partial(_call_all, acknowledge, on_delivered)
+            await dispenser.put(projectile, on_delivered=on_delivered)
 
-        self.log.debug(f"Running a event loop cycle...")
-        await asyncio.sleep(0)
+            self.log.debug("Running a event loop cycle...")
+            await asyncio.sleep(0)
 
 
 __all__ = (
@@ -0,0 +1,200 @@
+"""
+This module contains :class:`.ShardedConversationListImplementation`, a :class:`.ConversationListImplementation` which
+runs its :class:`~royalnet.engineer.conversation.Conversation`\\ s in multiple worker processes.
+"""
+
+import abc
+import asyncio
+import multiprocessing
+import os
+
+import royalnet.royaltyping as t
+from royalnet.engineer import metrics
+from royalnet.engineer.pda.implementations.base import ConversationListImplementation, DispenserKey
+
+if t.TYPE_CHECKING:
+    from royalnet.engineer.bullet.projectiles import Projectile
+
+
+class ShardedConversationListImplementation(ConversationListImplementation, metaclass=abc.ABCMeta):
+    """
+    A :class:`.ConversationListImplementation` which, instead of running the
+    :class:`~royalnet.engineer.conversation.Conversation`\\ s in the current process, routes every
+    :class:`~royalnet.engineer.bullet.projectile.Projectile` to one of :attr:`.shards` worker processes based on the
+    :func:`hash` of its :class:`~royalnet.engineer.dispenser.Dispenser` key.
+
+    All projectiles with the same key are handled, in the order they were :meth:`.put`, by the same worker, which runs
+    its own event loop and its own copy of :attr:`.dispensers`.
+
+    .. warning:: Projectiles are sent to the workers through a :class:`multiprocessing.Queue`, so they must be
+                 picklable, and must not depend on resources which only exist in the main process.
+    """
+
+    def __init__(self, name: str, shards: t.Optional[int] = None, start_method: t.Optional[str] = None, **kwargs):
+        if kwargs.get("journal") is not None:
+            raise ValueError("Sharded implementations can't keep a journal, as the workers deliver the projectiles")
+        super().__init__(name=name, **kwargs)
+
+        self.shards: int = shards or os.cpu_count() or 1
+        """
+        The number of worker processes to run.
+        """
+
+        self.context = multiprocessing.get_context(start_method)
+        """
+        The :mod:`multiprocessing` context used to start the workers.
+        """
+
+        self.queues: list[multiprocessing.Queue] = []
+        """
+        The queues used to send ``(key, projectile)`` pairs to each worker, or an empty :class:`list` if the workers
+        haven't been started yet.
+        """
+
+        self.workers: list[multiprocessing.Process] = []
+        """
+        The worker processes, or an empty :class:`list` if they haven't been started yet.
+        """
+
+    def __getstate__(self):
+        # Workers receive a copy of the implementation, but not the handles to the other workers, and the taps are
+        # only called in the main process
+        state = self.__dict__.copy()
+        del state["context"]
+        del state["queues"]
+        del state["workers"]
+        state["taps"] = []
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.context = None
+        self.queues = []
+        self.workers = []
+
+    def shard_of(self, key: DispenserKey) -> int:
+        """
+        :param key: The key of a :class:`~royalnet.engineer.dispenser.Dispenser`.
+        :return: The index of the worker which handles the projectiles with the given key.
+        """
+        return hash(key) % self.shards
+
+    def start_shards(self) -> None:
+        """
+        Start the worker processes, if they aren't running already.
+
+        It is called automatically by the first :meth:`.put`, but it's recommended to call it before starting the
+        event loop, especially if the ``fork`` start method is being used.
+        """
+
+        if self.workers:
+            return
+
+        self.log.info(f"Starting {self.shards} shards...")
+        for index in range(self.shards):
+            queue, worker = self._start_shard(index)
+            self.queues.append(queue)
+            self.workers.append(worker)
+
+    def _start_shard(self, index: int) -> tuple[multiprocessing.Queue, multiprocessing.Process]:
+        """
+        Start a single worker process.
+
+        :param index: The index of the worker.
+        :return: The queue used to send projectiles to the worker, and the worker process.
+        """
+
+        queue = self.context.Queue()
+        worker = self.context.Process(
+            target=self._shard_main,
+            args=(index, queue),
+            name=f"{self.name}.shard{index}",
+            daemon=True,
+        )
+        worker.start()
+        return queue, worker
+
+    def stop_shards(self) -> None:
+        """
+        Ask the worker processes to stop after putting all the projectiles they received in their dispensers, and
+        wait for them to exit.
+
+        .. warning:: The conversations which are still running in the workers at that point are cancelled.
+        """
+
+        self.log.info(f"Stopping {len(self.workers)} shards...")
+        for queue in self.queues:
+            queue.put(None)
+        for worker in self.workers:
+            worker.join()
+
+        self.queues = []
+        self.workers = []
+
+    def _shard_main(self, index: int, queue: multiprocessing.Queue) -> None:
+        """
+        The entry point of a worker process.
+
+        :param index: The index of the worker.
+        :param queue: The queue the worker should receive projectiles from.
+        """
+
+        # With the fork start method the worker inherits the taps of the main process, which already called them
+        self.taps = []
+
+        self.log.debug(f"Shard {index} started")
+        asyncio.run(self._shard_run(queue))
+        self.log.debug(f"Shard {index} stopped")
+
+    async def _shard_run(self, queue: multiprocessing.Queue) -> None:
+        """
+        Receive ``(key, projectile)`` pairs from the ``queue`` and handle them in this process, one at a time, until
+        :data:`None` is received.
+
+        The :attr:`.taps` are not called, as they were already called by :meth:`.put` in the main process.
+
+        :param queue: The queue to receive projectiles from.
+        """
+
+        loop = asyncio.get_running_loop()
+        while (item := await loop.run_in_executor(None, queue.get)) is not None:
+            key, projectile = item
+            try:
+                await self._put(key=key, projectile=projectile)
+            except Exception:
+                self.log.exception("Failed to handle %r in shard", projectile)
+
+    async def put(self,
+                  key: DispenserKey,
+                  projectile: "Projectile",
+                  on_delivered: t.Optional[t.Callable[[], t.Any]] = None) -> None:
+        """
+        Send a :class:`~royalnet.engineer.bullet.projectile.Projectile` to the worker process responsible for the
+        specified key.
+
+        :param key: The key identifying the :class:`~royalnet.engineer.dispenser.Dispenser` among the other
+                    :attr:`.dispensers`.
+        :param projectile: The :class:`~royalnet.engineer.bullet.projectile.Projectile` to insert.
+        :param on_delivered: A function to call once the projectile has been sent to its worker, as the delivery to
+                             the conversations happens in another process.
+        """
+
+        if not self.workers:
+            self.start_shards()
+
+        metrics.projectiles.inc(self.name)
+        self._call_taps(key, projectile)
+
+        index = self.shard_of(key)
+        if not self.workers[index].is_alive():
+            self.log.error(f"Shard {index} exited with code {self.workers[index].exitcode}, restarting it...")
+            self.queues[index], self.workers[index] = self._start_shard(index)
+
+        self.queues[index].put((key, projectile))
+        if on_delivered is not None:
+            on_delivered()
+
+
+__all__ = (
+    "ShardedConversationListImplementation",
+)
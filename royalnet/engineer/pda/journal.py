@@ -0,0 +1,334 @@
+"""
+This module contains the :class:`.Journal` class, a write-ahead log of the projectiles put in a
+:class:`~royalnet.engineer.pda.implementations.base.ConversationListImplementation`, which allows it to
+:meth:`~royalnet.engineer.pda.implementations.base.ConversationListImplementation.resume` handling the projectiles
+which were not delivered to any conversation before the process stopped.
+
+The journal is a directory of append-only segment files, named after the offset of their first record, and a
+checkpoint file, containing the offset below which every record has been acknowledged; segments whose records have all
+been acknowledged are deleted when a checkpoint is written.
+
+Records are acknowledged when their projectile leaves the queues of all the sentries it was put in, either because the
+conversations received it, or because they ended or were cancelled before doing so; a projectile which was received
+by a conversation which then crashed while handling it is not resumed. As acknowledgements are saved only every
+:attr:`.Journal.checkpoint_every` records, a projectile may instead be resumed after it has already been handled.
+
+The journal should be closed before the conversations are cancelled when the bot stops, so that the projectiles left
+in their queues aren't acknowledged, and are resumed on the next start.
+
+.. code-block::
+
+   implementation = MyImplementation("example", journal=Journal("/var/lib/bot/journal"))
+   await implementation.resume()
+   ...
+   implementation.journal.close()
+"""
+
+from __future__ import annotations
+
+import logging
+import mmap
+import os
+import pickle
+import struct
+import zlib
+
+import royalnet.royaltyping as t
+
+if t.TYPE_CHECKING:
+    from royalnet.engineer.bullet.projectiles import Projectile
+    from royalnet.engineer.pda.implementations.base import DispenserKey
+
+log = logging.getLogger(__name__)
+
+_RECORD = struct.Struct("<QII")
+"""
+The header of every record: its offset, the length of the serialized ``(key, projectile)`` pair which follows, and
+its :func:`zlib.crc32`.
+"""
+
+_SEGMENT_SUFFIX = ".seg"
+_CHECKPOINT = "checkpoint"
+
+
+def _records(path: str) -> t.Iterator[tuple[int, int, bytes]]:
+    """
+    Read the valid records of a segment file, stopping at the first truncated or corrupted one.
+
+    :param path: The path of the segment file.
+    :return: An iterator of ``(offset, end, payload)`` tuples, where ``end`` is the position in the file right after
+             the record.
+    """
+    with open(path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            position = 0
+            while position + _RECORD.size <= len(data):
+                offset, length, crc = _RECORD.unpack_from(data, position)
+                start = position + _RECORD.size
+                payload = data[start:start + length]
+                if len(payload) < length or zlib.crc32(payload) != crc:
+                    return
+                position = start + length
+                yield offset, position, payload
+
+
+class Journal:
+    """
+    An append-only, on-disk log of ``(key, projectile)`` pairs, each identified by a sequential offset.
+
+    .. warning:: Projectiles are serialized with :func:`pickle.dumps` by default, so they must be picklable, and must
+                 not depend on resources which only exist while the bot is running.
+    """
+
+    def __init__(self,
+                 directory: str,
+                 segment_size: int = 16 * 1024 * 1024,
+                 checkpoint_every: int = 100,
+                 sync: bool = False,
+                 dumps: t.Callable[[t.Any], bytes] = pickle.dumps,
+                 loads: t.Callable[[bytes], t.Any] = pickle.loads):
+        self.directory: str = directory
+        """
+        The directory the segment files and the checkpoint are stored in.
+        """
+
+        self.segment_size: int = segment_size
+        """
+        The size in bytes after which a new segment file is started.
+        """
+
+        self.checkpoint_every: int = checkpoint_every
+        """
+        After how many acknowledged records a :meth:`.checkpoint` is automatically written.
+
+        Acknowledgements are only persisted by checkpoints, so if the process crashes, up to this many records which
+        were already handled are returned again by :meth:`.pending`, and resumed: delivery is at-least-once, and
+        conversations should tolerate receiving a projectile twice. Lowering it shrinks this window, at the cost of
+        writing the checkpoint file more often.
+        """
+
+        self.sync: bool = sync
+        """
+        Whether every record should be :func:`os.fsync`\\ ed to disk before :meth:`.append` returns, so that it
+        survives a crash of the whole system instead of only one of the process.
+        """
+
+        self.dumps: t.Callable[[t.Any], bytes] = dumps
+        """
+        The function used to serialize ``(key, projectile)`` pairs.
+        """
+
+        self.loads: t.Callable[[bytes], t.Any] = loads
+        """
+        The function used to deserialize ``(key, projectile)`` pairs.
+        """
+
+        self.acknowledged: int = -1
+        """
+        The offset up to which every record has been :meth:`.acknowledge`\\ d, or ``-1`` if none has.
+        """
+
+        self.next_offset: int = 0
+        """
+        The offset the next :meth:`.append`\\ ed record will have.
+        """
+
+        self.segments: list[int] = []
+        """
+        The offsets of the first record of each segment file, in ascending order; the last one is being appended to.
+        """
+
+        self.last: t.Optional[tuple["DispenserKey", "Projectile"]] = None
+        """
+        The last ``(key, projectile)`` pair appended to the journal, even before the process was restarted, or
+        :data:`None` if the journal is empty; implementations may use it to ask their frontend for the projectiles
+        received after it only.
+        """
+
+        self._pending_acks: set[int] = set()
+        """
+        The acknowledged offsets greater than :attr:`.acknowledged`, which were acknowledged out of order.
+        """
+
+        self._unsaved: int = 0
+        """
+        The number of records acknowledged since the last :meth:`.checkpoint`.
+        """
+
+        self._file: t.Optional[t.BinaryIO] = None
+        self._size: int = 0
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._recover()
+
+    def __repr__(self):
+        return (
+            f"<{self.__class__.__qualname__} {self.directory!r} "
+            f"acknowledged={self.acknowledged} next_offset={self.next_offset}>"
+        )
+
+    def _segment_path(self, base: int) -> str:
+        return os.path.join(self.directory, f"{base:020d}{_SEGMENT_SUFFIX}")
+
+    def _recover(self) -> None:
+        """
+        Read the checkpoint and the segment files, and truncate the last segment after its last valid record, which
+        may have been only partially written if the process was killed while appending it.
+        """
+        try:
+            with open(os.path.join(self.directory, _CHECKPOINT)) as file:
+                self.acknowledged = int(file.read().strip())
+        except FileNotFoundError:
+            pass
+
+        self.segments = sorted(
+            int(name[:-len(_SEGMENT_SUFFIX)])
+            for name in os.listdir(self.directory)
+            if name.endswith(_SEGMENT_SUFFIX)
+        )
+
+        self.next_offset = self.acknowledged + 1
+        size = 0
+        if self.segments:
+            path = self._segment_path(self.segments[-1])
+            self.next_offset = max(self.next_offset, self.segments[-1])
+            last_payload = None
+            for offset, size, last_payload in _records(path):
+                self.next_offset = offset + 1
+            if size != os.path.getsize(path):
+                log.warning("Truncating the incomplete record at the end of %r", path)
+                os.truncate(path, size)
+            if last_payload is not None:
+                try:
+                    self.last = self.loads(last_payload)
+                except Exception as e:
+                    log.warning(f"Can't deserialize the last record of {path!r}: {e!r}")
+        else:
+            self.segments.append(self.next_offset)
+
+        self._file = open(self._segment_path(self.segments[-1]), "ab")
+        self._size = size
+        log.debug("Recovered %r", self)
+
+    def _rotate(self) -> None:
+        """
+        Close the segment file being appended to, and start a new one.
+        """
+        self._file.close()
+        self.segments.append(self.next_offset)
+        self._file = open(self._segment_path(self.next_offset), "ab")
+        self._size = 0
+
+    def append(self, key: "DispenserKey", projectile: "Projectile") -> int:
+        """
+        Write a ``(key, projectile)`` pair at the end of the journal.
+
+        :param key: The key of the :class:`~royalnet.engineer.dispenser.Dispenser` the projectile is put in.
+        :param projectile: The projectile.
+        :return: The offset of the record, to be :meth:`.acknowledge`\\ d once the projectile has been handled.
+        """
+        payload = self.dumps((key, projectile))
+
+        if self._size >= self.segment_size:
+            self._rotate()
+
+        offset = self.next_offset
+        self._file.write(_RECORD.pack(offset, len(payload), zlib.crc32(payload)))
+        self._file.write(payload)
+        self._file.flush()
+        if self.sync:
+            os.fsync(self._file.fileno())
+
+        self._size += _RECORD.size + len(payload)
+        self.next_offset = offset + 1
+        self.last = (key, projectile)
+        return offset
+
+    def acknowledge(self, offset: int) -> None:
+        """
+        Mark a record as handled, so that it won't be returned by :meth:`.pending` anymore.
+
+        Records may be acknowledged in any order, but :attr:`.acknowledged` only advances past records which have all
+        been acknowledged.
+
+        Records acknowledged after the journal has been :meth:`.close`\\ d are ignored, as they are acknowledged
+        because their conversations are being cancelled.
+
+        :param offset: The offset of the record.
+        """
+        if self._file is None or offset <= self.acknowledged:
+            return
+        self._pending_acks.add(offset)
+        while (self.acknowledged + 1) in self._pending_acks:
+            self._pending_acks.remove(self.acknowledged + 1)
+            self.acknowledged += 1
+            self._unsaved += 1
+
+        if self._unsaved >= self.checkpoint_every:
+            self.checkpoint()
+
+    def checkpoint(self) -> None:
+        """
+        Atomically save :attr:`.acknowledged` to the checkpoint file, then delete the segment files whose records
+        have all been acknowledged.
+        """
+        path = os.path.join(self.directory, _CHECKPOINT)
+        temporary = f"{path}.tmp"
+        with open(temporary, "w") as file:
+            file.write(f"{self.acknowledged}\n")
+            if self.sync:
+                file.flush()
+                os.fsync(file.fileno())
+        os.replace(temporary, path)
+        self._unsaved = 0
+
+        while len(self.segments) > 1 and self.segments[1] - 1 <= self.acknowledged:
+            log.debug("Deleting acknowledged segment %d", self.segments[0])
+            os.remove(self._segment_path(self.segments.pop(0)))
+
+    def pending(self) -> t.Iterator[tuple[int, "DispenserKey", "Projectile"]]:
+        """
+        Read the records which have not been acknowledged yet, in the order they were appended.
+
+        Records appended while iterating are not returned.
+
+        :return: An iterator of ``(offset, key, projectile)`` tuples.
+        """
+        end = self.next_offset
+        segments = list(self.segments)
+        for base, following in zip(segments, [*segments[1:], None]):
+            if base >= end:
+                break
+            # Segments may be deleted by a checkpoint written while iterating, but only if they are acknowledged
+            if following is not None and following - 1 <= self.acknowledged:
+                continue
+            for offset, _, payload in _records(self._segment_path(base)):
+                if offset >= end:
+                    return
+                if offset <= self.acknowledged or offset in self._pending_acks:
+                    continue
+                try:
+                    key, projectile = self.loads(payload)
+                except Exception as e:
+                    log.warning(f"Skipping record {offset}, as it can't be deserialized: {e!r}")
+                    self.acknowledge(offset)
+                    continue
+                yield offset, key, projectile
+
+    def close(self) -> None:
+        """
+        Write a last :meth:`.checkpoint` and close the segment file being appended to, ignoring the acknowledgements
+        received afterwards.
+        """
+        if self._file is None:
+            return
+        self.checkpoint()
+        self._file.close()
+        self._file = None
+
+
+__all__ = (
+    "Journal",
+)
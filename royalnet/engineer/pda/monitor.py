@@ -0,0 +1,98 @@
+"""
+This module contains the :class:`.LagMonitor` class.
+"""
+
+import asyncio
+import logging
+
+import royalnet.royaltyping as t
+
+log = logging.getLogger(__name__)
+
+
+class LagMonitor:
+    """
+    A :class:`.LagMonitor` periodically schedules a callback on the running event loop and measures how late it is
+    actually called, which is how long the loop was busy doing something else.
+    """
+
+    def __init__(self,
+                 interval: float = 1.0,
+                 threshold: float = 0.1,
+                 on_lag: t.Optional[t.Callable[[float], None]] = None):
+        self.interval: float = interval
+        """
+        The number of seconds between two measurements.
+        """
+
+        self.threshold: float = threshold
+        """
+        The lag, in seconds, above which :attr:`.on_lag` is called.
+        """
+
+        self.on_lag: t.Callable[[float], None] = on_lag or self._log_lag
+        """
+        The function called with the measured lag every time it exceeds :attr:`.threshold`; by default, it logs a
+        warning.
+
+        Exceptions raised by it are logged, and don't stop the monitor.
+        """
+
+        self.last: float = 0.0
+        """
+        The last measured lag, in seconds.
+        """
+
+        self.max: float = 0.0
+        """
+        The highest measured lag, in seconds.
+        """
+
+        self.samples: int = 0
+        """
+        The number of measurements taken.
+        """
+
+        self.exceeded: int = 0
+        """
+        The number of measurements which exceeded :attr:`.threshold`.
+        """
+
+    def __repr__(self):
+        return f"<{self.__class__.__qualname__} last={self.last:.3f}s max={self.max:.3f}s>"
+
+    @staticmethod
+    def _log_lag(lag: float) -> None:
+        log.warning(f"Event loop is lagging by {lag:.3f}s")
+
+    def record(self, lag: float) -> None:
+        """
+        Record a measurement of the event loop lag.
+
+        :param lag: The measured lag, in seconds.
+        """
+        self.last = lag
+        self.samples += 1
+        if lag > self.max:
+            self.max = lag
+        if lag > self.threshold:
+            self.exceeded += 1
+            try:
+                self.on_lag(lag)
+            except Exception:
+                log.exception(f"Lag callback {self.on_lag!r} failed on a lag of {lag:.3f}s")
+
+    async def run(self) -> None:
+        """
+        Measure the lag of the running event loop every :attr:`.interval` seconds, until cancelled.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.record(max(loop.time() - expected, 0.0))
+
+
+__all__ = (
+    "LagMonitor",
+)
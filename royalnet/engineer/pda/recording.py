@@ -0,0 +1,280 @@
+"""
+This module contains the :class:`.Recorder` class, which records the projectiles put in a
+:class:`~royalnet.engineer.pda.implementations.base.ConversationListImplementation` to a file, and the :func:`.replay`
+function, which puts them again in an implementation, reproducing the timing they were received with.
+
+.. code-block::
+
+   with open_recording("traffic.rnr.gz", "wb") as file:
+       implementation.taps.append(Recorder(file))
+       ...
+
+   with open_recording("traffic.rnr.gz", "rb") as file:
+       report = await replay(implementation, file, speed=10.0)
+   print(report)
+"""
+
+from __future__ import annotations
+
+import array
+import asyncio
+import dataclasses
+import functools
+import gzip
+import logging
+import pickle
+import struct
+import time
+
+import royalnet.royaltyping as t
+
+if t.TYPE_CHECKING:
+    from royalnet.engineer.bullet.projectiles import Projectile
+    from royalnet.engineer.pda.implementations.base import ConversationListImplementation, DispenserKey
+
+log = logging.getLogger(__name__)
+
+MAGIC = b"RNREC\x01"
+"""
+The bytes every recording starts with.
+"""
+
+_FRAME = struct.Struct("<dI")
+"""
+The header of every recorded projectile: the seconds elapsed since the previous one, and the length of the
+serialized ``(key, projectile)`` pair which follows.
+"""
+
+
+def open_recording(path: str, mode: str = "rb") -> t.BinaryIO:
+    """
+    Open a recording file, compressing it with :mod:`gzip` if its name ends with ``.gz``.
+
+    :param path: The path of the file.
+    :param mode: Either ``rb`` or ``wb``.
+    :return: The opened file.
+    """
+    if path.endswith(".gz"):
+        return gzip.open(path, mode)
+    return open(path, mode)
+
+
+class Recorder:
+    """
+    A tap for :attr:`~royalnet.engineer.pda.implementations.base.ConversationListImplementation.taps` which writes
+    every projectile put in the implementation to a file, along with its key and the time elapsed since the previous
+    one.
+
+    .. warning:: Projectiles are serialized with :func:`pickle.dumps` by default, so they must be picklable, and must
+                 not depend on resources which only exist while the bot is running; projectiles which can't be
+                 serialized are skipped.
+    """
+
+    def __init__(self, file: t.BinaryIO, dumps: t.Callable[[t.Any], bytes] = pickle.dumps):
+        self.file: t.BinaryIO = file
+        """
+        The file the projectiles are written to.
+        """
+
+        self.dumps: t.Callable[[t.Any], bytes] = dumps
+        """
+        The function used to serialize ``(key, projectile)`` pairs.
+        """
+
+        self.recorded: int = 0
+        """
+        The number of recorded projectiles.
+        """
+
+        self.skipped: int = 0
+        """
+        The number of projectiles which couldn't be serialized.
+        """
+
+        self._last: t.Optional[float] = None
+
+        self.file.write(MAGIC)
+
+    def __repr__(self):
+        return f"<{self.__class__.__qualname__} recorded={self.recorded} skipped={self.skipped}>"
+
+    def __call__(self, key: "DispenserKey", projectile: "Projectile") -> None:
+        """
+        Record a projectile.
+
+        :param key: The key of the :class:`~royalnet.engineer.dispenser.Dispenser` the projectile is put in.
+        :param projectile: The projectile.
+        """
+        try:
+            payload = self.dumps((key, projectile))
+        except (pickle.PicklingError, TypeError, AttributeError) as e:
+            log.warning(f"Not recording {projectile!r}, as it can't be serialized: {e!r}")
+            self.skipped += 1
+            return
+
+        now = time.monotonic()
+        delay = now - self._last if self._last is not None else 0.0
+        self._last = now
+
+        self.file.write(_FRAME.pack(delay, len(payload)))
+        self.file.write(payload)
+        self.recorded += 1
+
+
+def read_recording(file: t.BinaryIO, loads: t.Callable[[bytes], t.Any] = pickle.loads) \
+        -> t.Iterator[tuple[float, "DispenserKey", "Projectile"]]:
+    """
+    Read the projectiles of a recording.
+
+    :param file: The file the recording was written to by a :class:`.Recorder`.
+    :param loads: The function to deserialize ``(key, projectile)`` pairs with.
+    :return: An iterator of ``(delay, key, projectile)`` tuples, where ``delay`` is the number of seconds elapsed since
+             the previous projectile was recorded.
+    :raises ValueError: If the file is not a recording, or if it is truncated.
+    """
+    if file.read(len(MAGIC)) != MAGIC:
+        raise ValueError("Not a royalnet recording")
+
+    while header := file.read(_FRAME.size):
+        if len(header) < _FRAME.size:
+            raise ValueError("Truncated recording")
+        delay, length = _FRAME.unpack(header)
+        payload = file.read(length)
+        if len(payload) < length:
+            raise ValueError("Truncated recording")
+        key, projectile = loads(payload)
+        yield delay, key, projectile
+
+
+@dataclasses.dataclass
+class ReplayReport:
+    """
+    The results of a :func:`.replay`.
+    """
+
+    seconds: float
+    """
+    How many seconds the replay took, including the time spent waiting for the last projectiles to be delivered.
+    """
+
+    latencies: array.array
+    """
+    The end-to-end latency of each replayed projectile which was delivered, in seconds: the time between when it
+    should have been put according to the recording and when it was delivered to all the conversations it was put in
+    front of.
+    """
+
+    dispatch_latencies: array.array = dataclasses.field(default_factory=lambda: array.array("d"))
+    """
+    The dispatch latency of each replayed projectile, in seconds: the time between when it should have been put
+    according to the recording and when
+    :meth:`~royalnet.engineer.pda.implementations.base.ConversationListImplementation.put` returned.
+    """
+
+    undelivered: int = 0
+    """
+    The number of projectiles which weren't delivered before the replay timed out.
+    """
+
+    def __str__(self):
+        return (
+            f"{len(self.dispatch_latencies)} projectiles in {self.seconds:.3f}s ({self.throughput:.1f}/s), "
+            f"latency p50 {self.percentile(0.50) * 1000:.3f}ms, p99 {self.percentile(0.99) * 1000:.3f}ms, "
+            f"max {self.percentile(1.0) * 1000:.3f}ms, "
+            f"dispatch p99 {self.percentile(0.99, self.dispatch_latencies) * 1000:.3f}ms, "
+            f"{self.undelivered} undelivered"
+        )
+
+    @property
+    def throughput(self) -> float:
+        """
+        The number of projectiles put per second.
+        """
+        return len(self.dispatch_latencies) / self.seconds if self.seconds else float("inf")
+
+    def percentile(self, fraction: float, latencies: t.Optional[array.array] = None) -> float:
+        """
+        :param fraction: The percentile to compute, between ``0.0`` and ``1.0``.
+        :param latencies: The latencies to compute the percentile of, or :data:`None` for the end-to-end
+                          :attr:`.latencies`.
+        :return: The latency below which the given fraction of the projectiles fall, in seconds.
+        """
+        if latencies is None:
+            latencies = self.latencies
+        if not latencies:
+            return 0.0
+        ordered = sorted(latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def replay(implementation: "ConversationListImplementation",
+                 file: t.BinaryIO,
+                 speed: t.Optional[float] = 1.0,
+                 loads: t.Callable[[bytes], t.Any] = pickle.loads,
+                 timeout: t.Optional[float] = 10.0) -> ReplayReport:
+    """
+    :meth:`~royalnet.engineer.pda.implementations.base.ConversationListImplementation.put` again the projectiles of
+    a recording in an implementation, one at a time, in the order they were recorded, then wait for all of them to be
+    delivered.
+
+    :param implementation: The implementation to put the projectiles in.
+    :param file: The file the recording was written to by a :class:`.Recorder`.
+    :param speed: How many times faster than they were recorded the projectiles should be put, such as ``1.0`` for
+                  the original timing, or :data:`None` to put them as fast as possible.
+    :param loads: The function to deserialize ``(key, projectile)`` pairs with.
+    :param timeout: The maximum number of seconds to wait for the projectiles to be delivered after the last one has
+                    been put, or :data:`None` to wait forever.
+    :return: A :class:`.ReplayReport` of the replay.
+    """
+    loop = asyncio.get_running_loop()
+    latencies = array.array("d")
+    dispatch_latencies = array.array("d")
+    undelivered = 0
+    finished = False
+    all_delivered = asyncio.Event()
+
+    def delivered(scheduled: float) -> None:
+        nonlocal undelivered
+        if finished:
+            return
+        latencies.append(loop.time() - scheduled)
+        undelivered -= 1
+        if not undelivered:
+            all_delivered.set()
+
+    started = scheduled = loop.time()
+    for delay, key, projectile in read_recording(file, loads):
+        if speed:
+            scheduled += delay / speed
+            if (wait := scheduled - loop.time()) > 0:
+                await asyncio.sleep(wait)
+        else:
+            scheduled = loop.time()
+
+        undelivered += 1
+        all_delivered.clear()
+        await implementation.put(key=key, projectile=projectile, on_delivered=functools.partial(delivered, scheduled))
+        dispatch_latencies.append(loop.time() - scheduled)
+
+    if undelivered:
+        try:
+            await asyncio.wait_for(all_delivered.wait(), timeout)
+        except asyncio.TimeoutError:
+            log.warning(f"{undelivered} replayed projectiles weren't delivered in {timeout}s")
+    finished = True
+
+    return ReplayReport(
+        seconds=loop.time() - started,
+        latencies=latencies,
+        dispatch_latencies=dispatch_latencies,
+        undelivered=undelivered,
+    )
+
+
+__all__ = (
+    "Recorder",
+    "ReplayReport",
+    "open_recording",
+    "read_recording",
+    "replay",
+)
@@ -3,22 +3,139 @@ This module contains :class:`.Router`, an helper :class:`~royalnet.engineer.conv
 """
 
 import abc
+import contextlib
+import enum
 import logging
+import re
 
 import royalnet.engineer.bullet as b
 import royalnet.engineer.conversation as c
 import royalnet.engineer.sentry as s
 import royalnet.royaltyping as t
+from royalnet.tracing import tracer
 
 log = logging.getLogger(__name__)
 
+_ANCHORED_LITERAL = re.compile(r"(?:\^|\\A)((?:[^\\\[\](){}.*+?^$|]|\\[^\w\s])*)(.?)", re.DOTALL)
+_QUANTIFIERS = frozenset("*+?{")
+
+
+def _has_top_level_alternation(source: str) -> bool:
+    """
+    :param source: The source of a regex pattern.
+    :return: Whether the pattern contains a ``|`` outside of any group or character class.
+    """
+
+    depth = 0
+    index = 0
+    while index < len(source):
+        char = source[index]
+        if char == "\\":
+            index += 1
+        elif char == "[":
+            index += 1
+            if source[index:index + 1] == "^":
+                index += 1
+            if source[index:index + 1] == "]":
+                index += 1
+            while index < len(source) and source[index] != "]":
+                if source[index] == "\\":
+                    index += 1
+                index += 1
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "|" and depth == 0:
+            return True
+        index += 1
+    return False
+
+
+def _literal_prefix(pattern: t.Pattern) -> t.Optional[str]:
+    """
+    Find the literal text that a string must start with for the ``pattern`` to be found in it, which is the case if the
+    pattern is anchored to the start of the string with ``^`` or ``\\A`` and then continues with literal characters.
+
+    :param pattern: The compiled pattern to analyze.
+    :return: The literal prefix, or :data:`None` if the pattern can be found anywhere or if it couldn't be determined.
+    """
+
+    source = pattern.pattern
+    if not isinstance(source, str) or pattern.flags & (re.IGNORECASE | re.VERBOSE):
+        return None
+    if source.startswith("^") and pattern.flags & re.MULTILINE:
+        return None
+    if _has_top_level_alternation(source):
+        return None
+    if not (match := _ANCHORED_LITERAL.match(source)):
+        return None
+
+    literal, following = match.groups()
+    if following in _QUANTIFIERS:
+        # The last character is optional or repeated
+        literal = literal[:-2] if literal[-2:-1] == "\\" else literal[:-1]
+    prefix = re.sub(r"\\(.)", r"\1", literal)
+    return prefix or None
+
+
+class LockScope(enum.Enum):
+    """
+    How long a :class:`.Router` should keep its :class:`~royalnet.engineer.dispenser.Dispenser`
+    :meth:`~royalnet.engineer.dispenser.Dispenser.lock`\\ ed, preventing other conversations from being started in it.
+    """
+
+    CONVERSATION = "conversation"
+    """
+    Until the delegated conversation ends, so that it receives all the projectiles of the dispenser.
+    """
+
+    MATCH = "match"
+    """
+    Only while awaiting and matching the first projectile, so that a slow delegated conversation does not prevent the
+    other projectiles of the dispenser from being handled; delegated conversations registered as ``exclusive`` still
+    keep it locked until they end.
+
+    The sentry of the router is :meth:`~royalnet.engineer.dispenser.Dispenser.detach`\\ ed when the dispenser is
+    unlocked, so delegated conversations which aren't ``exclusive`` don't receive any further projectile, and awaiting
+    it raises :exc:`~royalnet.engineer.sentry.SentryClosedError`.
+    """
+
 
 class Router(c.Conversation, metaclass=abc.ABCMeta):
     """
     A conversation which delegates event handling to other conversations by matching the contents of the first message received to one or multiple regexes.
+
+    Messages starting with a registered command name are dispatched with a :class:`dict` lookup, only searching the
+    regexes registered before the ones of the named conversation; patterns anchored to the start of the text and
+    beginning with literal characters are indexed by them, so that only the ones which may be found in a message are
+    searched.
+
+    As in a plain scan of :attr:`.by_pattern`, the first registered pattern which can be found in a message always
+    wins, and conversations registered without patterns are never run, even if they have names.
+
+    While running, the router :meth:`~royalnet.engineer.dispenser.Dispenser.lock`\\ s its dispenser for as long as its
+    :attr:`.lock_scope` says.
     """
 
-    def __init__(self):
+    def __init__(self,
+                 *,
+                 prefixes: t.Collection[str] = ("/",),
+                 mentions: t.Collection[str] = (),
+                 lock_scope: LockScope = LockScope.CONVERSATION):
+        self.prefixes: tuple[str, ...] = tuple(prefixes)
+        """
+        The prefixes that the first word of a message should start with to be looked up in :attr:`.by_name`.
+        """
+
+        self.mentions: frozenset[str] = frozenset(mentions)
+        """
+        The bot names that may follow a command name after an ``@``, such as ``/ping@royalbot``.
+
+        Commands mentioning a bot not in this set are not looked up in :attr:`.by_name`, unless the set is empty, in
+        which case any mention is accepted.
+        """
+
         self.by_pattern: dict[t.Pattern, t.ConversationProtocol] = {}
         """
         A :class:`dict` mapping regex patterns to conversations registered with this router.
@@ -34,15 +151,67 @@ class Router(c.Conversation, metaclass=abc.ABCMeta):
         A :class:`dict` mapping conversations registered with this router to lists of command names.
         """
 
+        self.by_conversation: dict[t.ConversationProtocol, t.List[t.Pattern]] = {}
+        """
+        A :class:`dict` mapping conversations registered with this router to lists of regex patterns.
+        """
+
         self.else_convs: list[t.ConversationProtocol] = []
         """
         A :class:`list` of conversations to delegate event handling to in case no other pattern is matched.
         """
 
+        self.lock_scope: LockScope = lock_scope
+        """
+        How long the dispenser should be kept locked while running.
+        """
+
+        self.exclusive: set[t.ConversationProtocol] = set()
+        """
+        The conversations which keep the dispenser locked until they end even if the :attr:`.lock_scope` is
+        :attr:`.LockScope.MATCH`, as they need to receive all the projectiles of the dispenser, such as the ones
+        waiting for an answer from the user.
+
+        .. seealso:: :meth:`.register_conversation`
+        """
+
+        self._prefixes: dict[t.Pattern, t.Optional[str]] = {}
+        """
+        A :class:`dict` mapping the patterns in :attr:`.by_pattern` to the :func:`._literal_prefix` a text must start
+        with for them to be found in it.
+        """
+
+        self._by_prefix: t.Optional[dict[str, list[tuple[int, t.Pattern, t.ConversationProtocol]]]] = None
+        """
+        A :class:`dict` mapping literal prefixes to the ``(position, pattern, conversation)`` triples of the patterns in
+        :attr:`.by_pattern` with that prefix, or :data:`None` if it has to be rebuilt.
+
+        .. seealso:: :meth:`._index_patterns`
+        """
+
+        self._unprefixed: list[tuple[int, t.Pattern, t.ConversationProtocol]] = []
+        """
+        The ``(position, pattern, conversation)`` triples of the patterns in :attr:`.by_pattern` without a literal
+        prefix, which have to be searched in every text.
+        """
+
+        self._prefix_lengths: tuple[int, ...] = ()
+        """
+        The distinct lengths of the keys of :attr:`._by_prefix`.
+        """
+
+        self._positions: dict[t.Pattern, int] = {}
+        """
+        A :class:`dict` mapping the patterns in :attr:`.by_pattern` to their position in it.
+        """
+
     def register_conversation(self, conv: t.ConversationProtocol, names: t.List[str],
-                              patterns: t.List[t.Pattern]) -> None:
+                              patterns: t.List[t.Pattern], exclusive: bool = False) -> None:
         """
         Registers a new conversation with the :class:`.Router`, allowing it to run if one of the specified ``patterns`` is matched.
+
+        :param exclusive: Whether the conversation should be added to :attr:`.exclusive`, keeping the dispenser locked
+                          until it ends.
         """
 
         log.debug(f"Registering {conv!r}...")
@@ -52,60 +221,187 @@ class Router(c.Conversation, metaclass=abc.ABCMeta):
             log.debug(f"{name!r} → {conv!r}")
             self.by_name[name] = conv
         log.debug(f"{conv!r} → {names!r}")
+        self.by_command.setdefault(conv, []).extend(names)
 
         log.debug("Patterns:")
         for pattern in patterns:
             log.debug(f"{pattern.pattern!r} → {conv!r}")
             self.by_pattern[pattern] = conv
+            self._prefixes[pattern] = _literal_prefix(pattern)
+        self.by_conversation.setdefault(conv, []).extend(patterns)
+
+        if exclusive:
+            self.exclusive.add(conv)
+
+        log.debug("Invalidating the patterns index...")
+        self._by_prefix = None
+
+    def _index_patterns(self) -> None:
+        """
+        Index the patterns in :attr:`.by_pattern` by their literal prefix, so that :meth:`.match` only has to search
+        the ones which can be found in the text.
+        """
+
+        log.debug("Indexing patterns...")
+        by_prefix = {}
+        unprefixed = []
+        positions = {}
+        for position, (pattern, conversation) in enumerate(self.by_pattern.items()):
+            positions[pattern] = position
+            if (prefix := self._prefixes[pattern]) is None:
+                unprefixed.append((position, pattern, conversation))
+            else:
+                by_prefix.setdefault(prefix, []).append((position, pattern, conversation))
+
+        self._by_prefix = by_prefix
+        self._unprefixed = unprefixed
+        self._prefix_lengths = tuple(sorted({len(prefix) for prefix in by_prefix}))
+        self._positions = positions
+
+    def match_name(self, text: str) -> t.Optional[tuple[t.ConversationProtocol, dict[str, t.Any]]]:
+        """
+        Find the conversation whose name is the first word of the ``text``, once stripped of one of the
+        :attr:`.prefixes` and of a ``@`` followed by one of the :attr:`.mentions`, and one of whose patterns can be
+        found in the ``text``.
+
+        Unlike :meth:`.match`, patterns registered before the ones of the found conversation are not considered.
+
+        :param text: The text to look the command name up in.
+        :return: A :class:`tuple` of the matched conversation and the :meth:`re.Match.groupdict` of the match, or
+                 :data:`None` if no name matched.
+        """
+
+        if (found := self._match_name(text)) is None:
+            return None
+        _, conversation, match = found
+        return conversation, match.groupdict()
+
+    def _match_name(self, text: str) -> t.Optional[tuple[t.Pattern, t.ConversationProtocol, t.Match]]:
+        """
+        The same as :meth:`.match_name`, but returning the matched pattern and the :class:`re.Match` object.
+
+        :param text: The text to look the command name up in.
+        :return: A :class:`tuple` of the matched pattern, its conversation and the :class:`re.Match`, or :data:`None`
+                 if no name matched.
+        """
+
+        if not (words := text.split(None, 1)):
+            return None
+        command = words[0]
+
+        for prefix in self.prefixes:
+            if command.startswith(prefix):
+                command = command[len(prefix):]
+                break
+        else:
+            return None
+
+        name, at, mention = command.partition("@")
+        if at and self.mentions and mention not in self.mentions:
+            return None
+
+        if (conversation := self.by_name.get(name)) is None:
+            return None
+
+        for pattern in self.by_conversation.get(conversation, ()):
+            if self.by_pattern.get(pattern) is conversation and (match := pattern.search(text)):
+                return pattern, conversation, match
+        return None
+
+    def match(self, text: str) -> t.Optional[tuple[t.ConversationProtocol, dict[str, t.Any]]]:
+        """
+        Find the conversation that should handle the ``text``, which is the one of the first registered pattern which
+        can be found in it.
+
+        Command names are looked up first with :meth:`.match_name`, so that, if one matches, only the patterns
+        registered before the one it matched have to be searched; otherwise, only the patterns which may be found in
+        the ``text`` according to their literal prefix are searched.
+
+        :param text: The text to search the patterns in.
+        :return: A :class:`tuple` of the matched conversation and the :meth:`re.Match.groupdict` of the match, or
+                 :data:`None` if nothing matched.
+        """
+
+        if not self.by_pattern:
+            return None
+
+        if self._by_prefix is None:
+            self._index_patterns()
+
+        named = self._match_name(text)
+        limit = self._positions[named[0]] if named is not None else len(self._positions)
+
+        candidates = self._unprefixed
+        for length in self._prefix_lengths:
+            if length > len(text):
+                break
+            if (found := self._by_prefix.get(text[:length])) is not None:
+                if candidates is self._unprefixed:
+                    candidates = [*candidates, *found]
+                else:
+                    candidates.extend(found)
+        if candidates is not self._unprefixed:
+            candidates.sort(key=lambda candidate: candidate[0])
+
+        for position, pattern, conversation in candidates:
+            if position >= limit:
+                break
+            if match := pattern.search(text):
+                return conversation, match.groupdict()
+
+        if named is not None:
+            _, conversation, match = named
+            return conversation, match.groupdict()
+        return None
 
     async def run(self, _sentry: s.Sentry, _conv: t.ConversationProtocol, **kwargs) -> None:
         dispenser = _sentry.dispenser()
 
-        log.debug(f"Locking {dispenser!r}...")
-        with _sentry.dispenser().lock(self):
+        with contextlib.ExitStack() as lock:
+            log.debug("Locking %r...", dispenser)
+            lock.enter_context(dispenser.lock(self))
 
-            log.debug(f"Awaiting a projectile...")
+            log.debug("Awaiting a projectile...")
             projectile: b.Projectile = await _sentry
 
-            log.debug(f"Received: {projectile!r}")
+            with tracer.span("router.match", router=self, projectile=projectile) as span:
+                log.debug("Received: %r", projectile)
 
-            log.debug(f"Ensuring the projectile is a MessageReceived: {projectile!r}")
-            if not isinstance(projectile, b.MessageReceived):
-                log.debug(f"Returning: {projectile!r} is not a message")
-                return
+                if not isinstance(projectile, b.MessageReceived):
+                    log.debug("Returning: %r is not a message", projectile)
+                    return
 
-            log.debug(f"Getting message of: {projectile!r}")
-            if not (msg := await projectile.message):
-                log.warning(f"Returning: {projectile!r} has no message")
-                return
+                if not (msg := await projectile.message):
+                    log.warning("Returning: %r has no message", projectile)
+                    return
 
-            log.debug(f"Getting message text of: {msg!r}")
-            if not (text := await msg.text):
-                log.debug(f"Returning: {msg!r} has no text")
-                return
+                if not (text := await msg.text):
+                    log.debug("Returning: %r has no text", msg)
+                    return
 
-            log.debug(f"Message text is: {text!r}")
+                log.debug("Message text is: %r", text)
+                found = self.match(text)
+                span.set(matched=found is not None)
 
-            for pattern in self.by_pattern.keys():
-                log.debug(f"Trying to search for {pattern!r} in the text")
-                match = pattern.search(text)
-                if match:
-                    conversation = self.by_pattern[pattern]
-                    log.debug(f"Matched with {pattern!r}, running conversation {conversation}")
-                    await conversation(
-                        **match.groupdict(),
-                        **kwargs,
-                        _sentry=_sentry,
-                        _conv=conversation,
-                        _msg=msg,
-                        _text=text,
-                        _router=self,
-                    )
-                    return
+            if found:
+                conversation, groups = found
+                delegates = [(conversation, groups)]
+                log.debug("Matched, running conversation %s", conversation)
             else:
-                for conversation in self.else_convs:
-                    log.debug(f"No matches found, running conversation {conversation}")
+                delegates = [(conversation, {}) for conversation in self.else_convs]
+                log.debug("No matches found, running conversations %s", self.else_convs)
+
+            if self.lock_scope is LockScope.MATCH and not any(conv in self.exclusive for conv, _ in delegates):
+                log.debug("Unlocking %r...", dispenser)
+                lock.close()
+                # Nothing reads from the sentry anymore, so it would fill up and block the dispenser
+                if isinstance(_sentry, s.SentrySource):
+                    dispenser.detach(_sentry)
+
+            for conversation, groups in delegates:
+                with tracer.span("router.dispatch", router=self, conversation=conversation):
                     await conversation(
+                        **groups,
                         **kwargs,
                         _sentry=_sentry,
                         _conv=conversation,
@@ -116,5 +412,6 @@ class Router(c.Conversation, metaclass=abc.ABCMeta):
 
 
 __all__ = (
+    "LockScope",
     "Router",
 )
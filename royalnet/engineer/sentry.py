@@ -8,10 +8,16 @@ from __future__ import annotations
 
 import abc
 import asyncio
+import collections
+import enum
 import logging
 
 import royalnet.royaltyping as t
+from royalnet.tracing import tracer
 from . import discard
+from . import metrics
+from . import wrench as w
+from .exc import EngineerException
 
 if t.TYPE_CHECKING:
     from .dispenser import Dispenser
@@ -20,6 +26,55 @@ if t.TYPE_CHECKING:
 log = logging.getLogger(__name__)
 
 
+_CLOSED = object()
+"""
+The item put in the queue of a closed :class:`.SentrySource`, to wake up and stop the coroutines waiting for an item.
+"""
+
+
+class SentryException(EngineerException):
+    """
+    The base class for errors in :mod:`royalnet.engineer.sentry`\\ .
+    """
+
+
+class SentryClosedError(SentryException):
+    """
+    The :class:`.Sentry` was removed from its :class:`~royalnet.engineer.dispenser.Dispenser`, and won't receive any
+    more :class:`~royalnet.engineer.bullet.projectiles._base.Projectile`\\ s.
+    """
+
+
+class OverflowPolicy(enum.Enum):
+    """
+    What a :class:`.SentrySource` should do when a new item is put in its queue while it is full.
+    """
+
+    BLOCK = "block"
+    """
+    Wait until there is space in the queue, delaying the :meth:`~royalnet.engineer.dispenser.Dispenser.put` of the
+    item until the conversation receives the ones before it.
+    """
+
+    DROP_OLDEST = "drop_oldest"
+    """
+    Drop the oldest item in the queue to make space for the new one.
+    """
+
+    DROP_NEWEST = "drop_newest"
+    """
+    Drop the new item.
+    """
+
+    SPILL = "spill"
+    """
+    Store the new item in an unbounded overflow buffer, from which the queue is refilled as items are consumed.
+
+    It is the default policy, as it never blocks nor loses items, at the cost of keeping in memory the items which a
+    slow conversation hasn't received yet.
+    """
+
+
 class Sentry(metaclass=abc.ABCMeta):
     """
     A :class:`.Sentry` is an asynchronous receiver for :class:`~royalnet.engineer.bullet.projectiles._base.Projectile`
@@ -44,6 +99,7 @@ class Sentry(metaclass=abc.ABCMeta):
         :return: The **returned** :class:`~royalnet.engineer.bullet.projectiles._base.Projectile`.
 
         :raises asyncio.QueueEmpty: If the queue is empty.
+        :raises .SentryClosedError: If the sentry has been removed from its dispenser, and its queue is empty.
         :raises .discard.Discard: If the object was **:class:`~royalnet.engineer.discard.Discard`\\ ed** by
                                   the pipeline.
         :raises Exception: If an exception was **raised** in the pipeline.
@@ -60,6 +116,7 @@ class Sentry(metaclass=abc.ABCMeta):
         :return: The **returned** :class:`~royalnet.engineer.bullet.projectiles._base.Projectile`.
 
         :raises .discard.Discard: If the object was **discarded** by the pipeline.
+        :raises .SentryClosedError: If the sentry has been removed from its dispenser, and its queue is empty.
         :raises Exception: If an exception was **raised** in the pipeline.
         """
         raise NotImplementedError()
@@ -71,22 +128,23 @@ class Sentry(metaclass=abc.ABCMeta):
 
         :return: The **returned** :class:`~.bullet.Projectile`.
 
+        :raises .SentryClosedError: If the sentry has been removed from its dispenser, and its queue is empty.
         :raises Exception: If an exception was **raised** in the pipeline.
         """
         while True:
             try:
                 result = await self.get()
-                log.debug(f"Returned: {result}")
+                log.debug("Returned: %s", result)
                 return result
             except discard.Discard as d:
-                log.debug(f"{str(d)}")
+                log.debug("%s", d)
                 continue
 
     def __await__(self):
         """
         Awaiting an object implementing :class:`.Sentry` corresponds to awaiting :meth:`.wait`.
         """
-        return self.get().__await__()
+        return self.wait().__await__()
 
     @abc.abstractmethod
     async def put(self, item: "Projectile") -> None:
@@ -97,6 +155,18 @@ class Sentry(metaclass=abc.ABCMeta):
         """
         raise NotImplementedError()
 
+    @abc.abstractmethod
+    def put_nowait(self, item: "Projectile") -> bool:
+        """
+        Try to insert a new item in the queue **without blocking**, applying the :class:`.OverflowPolicy` of the
+        pipeline if the queue is full.
+
+        :param item: The item to be added.
+        :return: :data:`False` if the item could not be handled without blocking, and :meth:`.put` should be awaited
+                 instead, :data:`True` otherwise.
+        """
+        raise NotImplementedError()
+
     def filter(self, wrench: t.WrenchLike) -> SentryFilter:
         """
         Chain a new filter to the pipeline.
@@ -131,6 +201,21 @@ class Sentry(metaclass=abc.ABCMeta):
         except TypeError:
             raise TypeError("Right-side of bitwise-or operator must be either a Wrench or a coroutine function")
 
+    @abc.abstractmethod
+    def subscribe(self, *types: t.Type) -> None:
+        """
+        Declare which types of :class:`~royalnet.engineer.bullet.projectiles._base.Projectile` the pipeline is
+        interested in, so that the :class:`~royalnet.engineer.dispenser.Dispenser` can avoid putting the others in
+        the queue at all.
+
+        .. code-block::
+
+           _sentry.subscribe(engi.MessageReceived, engi.Reaction)
+
+        :param types: The accepted types; if none are specified, all projectiles are accepted.
+        """
+        raise NotImplementedError()
+
     @abc.abstractmethod
     def dispenser(self) -> Dispenser:
         """
@@ -157,18 +242,121 @@ class SentryFilter(Sentry):
         The coroutine function to apply to all objects passing through this node.
         """
 
+        self._source: t.Optional[Sentry] = None
+        """
+        The first node of the pipeline which isn't a :class:`.SentryFilter`, or :data:`None` if the pipeline hasn't
+        been :meth:`._compile`\\ d yet.
+        """
+
+        self._stages: tuple[tuple[t.Callable[[t.Any], t.Any], bool], ...] = ()
+        """
+        The wrenches of all the :class:`.SentryFilter`\\ s between :attr:`._source` and this node, in the order they
+        should be applied, each paired with whether it is synchronous and shouldn't be awaited.
+
+        .. seealso:: :class:`~royalnet.engineer.wrench.SyncWrench`
+        """
+
     def __len__(self) -> int:
         return len(self.previous) + 1
 
+    def _compile(self) -> None:
+        """
+        Flatten the chain of :class:`.SentryFilter`\\ s ending in this node, so that :meth:`.get` can apply all the
+        wrenches in a single coroutine instead of awaiting every node of the pipeline separately.
+        """
+        stages = []
+        node = self
+        while isinstance(node, SentryFilter):
+            stages.append(w.stage(node.wrench))
+            node = node.previous
+        stages.reverse()
+
+        self._stages = tuple(stages)
+        self._source = node
+
+    def _discarded(self, stage: t.Callable[[t.Any], t.Any], item: t.Any) -> discard.Discard:
+        """
+        Count an item discarded by a stage returning :data:`~royalnet.engineer.discard.DISCARD`.
+
+        :param stage: The stage which discarded the item.
+        :param item: The discarded item.
+        :return: The :exc:`~royalnet.engineer.discard.Discard` to raise.
+        """
+        metrics.discards.inc(metrics.wrench_name(stage))
+        wrench = getattr(stage, "__self__", stage)
+        if isinstance(wrench, w.SyncWrench):
+            return discard.Discard(obj=item, message=wrench.error(item))
+        return discard.Discard(obj=item, message=f"Discarded by {wrench!r}")
+
     def get_nowait(self):
-        return self.previous.get_nowait()
+        """
+        :raises TypeError: If some of the wrenches of the pipeline are asynchronous, and can't be applied without
+                           blocking.
+
+        .. seealso:: :meth:`.Sentry.get_nowait`
+        """
+        if self._source is None:
+            self._compile()
+        if not all(synchronous for _, synchronous in self._stages):
+            raise TypeError("Can't get an item without blocking from a pipeline with asynchronous wrenches")
+
+        item = self._source.get_nowait()
+        for stage, _ in self._stages:
+            try:
+                result = stage(item)
+            except discard.Discard:
+                metrics.discards.inc(metrics.wrench_name(stage))
+                raise
+            if result is discard.DISCARD:
+                raise self._discarded(stage, item)
+            item = result
+        return item
 
     async def get(self):
-        return await self.previous.get()
+        if self._source is None:
+            self._compile()
+
+        item = await self._source.get()
+        with tracer.span("sentry.filter", sentry=self, projectile=item):
+            for stage, synchronous in self._stages:
+                try:
+                    result = stage(item) if synchronous else await stage(item)
+                except discard.Discard:
+                    metrics.discards.inc(metrics.wrench_name(stage))
+                    raise
+                if result is discard.DISCARD:
+                    raise self._discarded(stage, item)
+                item = result
+        return item
+
+    async def wait(self):
+        if self._source is None:
+            self._compile()
+
+        # Same as get, but skipping discarded objects without raising anything
+        while True:
+            item = await self._source.get()
+            try:
+                for stage, synchronous in self._stages:
+                    if (item := stage(item) if synchronous else await stage(item)) is discard.DISCARD:
+                        metrics.discards.inc(metrics.wrench_name(stage))
+                        break
+                else:
+                    return item
+            except discard.Discard as d:
+                # noinspection PyUnboundLocalVariable
+                metrics.discards.inc(metrics.wrench_name(stage))
+                log.debug("%s", d)
 
     async def put(self, item) -> None:
         return await self.previous.put(item)
 
+    def put_nowait(self, item) -> bool:
+        return self.previous.put_nowait(item)
+
+    def subscribe(self, *types: t.Type) -> None:
+        return self.previous.subscribe(*types)
+
     def dispenser(self) -> Dispenser:
         return self.previous.dispenser()
 
@@ -178,28 +366,184 @@ class SentrySource(Sentry):
     The root and source of the pipeline.
     """
 
-    def __init__(self, dispenser: "Dispenser", queue_size: int = 12):
+    def __init__(self,
+                 dispenser: "Dispenser",
+                 queue_size: int = 12,
+                 overflow: OverflowPolicy = OverflowPolicy.SPILL,
+                 types: t.Optional[t.Collection[t.Type]] = None):
         self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
         self._dispenser: "Dispenser" = dispenser
 
+        self.types: t.Optional[tuple[t.Type, ...]] = tuple(types) if types else None
+        """
+        The types of projectiles this sentry is subscribed to, or :data:`None` if it is subscribed to all of them.
+
+        .. seealso:: :meth:`.subscribe`
+        """
+
+        self.overflow: OverflowPolicy = overflow
+        """
+        What to do when an item is put in the :attr:`.queue` while it is full.
+        """
+
+        self.spill: collections.deque = collections.deque()
+        """
+        The unbounded overflow buffer used by :attr:`.OverflowPolicy.SPILL`.
+        """
+
+        self.dropped: int = 0
+        """
+        The number of items dropped because of the :attr:`.overflow` policy.
+        """
+
+        self.blocked: collections.deque[tuple[t.Any, asyncio.Future]] = collections.deque()
+        """
+        The items waiting to be put in the :attr:`.queue` by :attr:`.OverflowPolicy.BLOCK`\\ ed :meth:`.put`\\ s, in
+        the order they were put, each paired with the future resolved once it is in the queue.
+        """
+
+        self.closed: bool = False
+        """
+        Whether the sentry has been removed from its dispenser, and won't return any more items.
+
+        .. seealso:: :meth:`.close`
+        """
+
     def __len__(self) -> int:
         return 1
 
+    def _refill(self) -> None:
+        """
+        Move items from the :attr:`.spill` buffer, or from the :attr:`.blocked` puts, to the :attr:`.queue`, until it
+        is full again.
+
+        If the sentry is :attr:`.closed` and no items are left, put :data:`._CLOSED` in the :attr:`.queue` instead.
+        """
+        while self.spill and not self.queue.full():
+            self.queue.put_nowait(self.spill.popleft())
+        while self.blocked and not self.queue.full():
+            item, future = self.blocked.popleft()
+            self.queue.put_nowait(item)
+            if not future.done():
+                future.set_result(None)
+        if self.closed and self.queue.empty():
+            self.queue.put_nowait(_CLOSED)
+
+    def _drop(self, item) -> None:
+        """
+        Count an item dropped because of the :attr:`.overflow` policy.
+
+        :param item: The dropped item.
+        """
+        self.dropped += 1
+        self._dispenser.dropped += 1
+        self._dispenser.delivered(item)
+
+    def _closed(self) -> SentryClosedError:
+        """
+        Put :data:`._CLOSED` back in the :attr:`.queue`, so that it stops the other coroutines waiting for an item too.
+
+        :return: The :exc:`.SentryClosedError` to raise.
+        """
+        self.queue.put_nowait(_CLOSED)
+        return SentryClosedError(f"{self!r} has been removed from its dispenser")
+
     def get_nowait(self):
-        return self.queue.get_nowait()
+        if (item := self.queue.get_nowait()) is _CLOSED:
+            raise self._closed()
+        self._refill()
+        self._dispenser.delivered(item)
+        return item
 
     async def get(self):
-        return await self.queue.get()
+        if (item := await self.queue.get()) is _CLOSED:
+            raise self._closed()
+        self._refill()
+        self._dispenser.delivered(item)
+        return item
 
     async def put(self, item) -> None:
-        return await self.queue.put(item)
+        if self.put_nowait(item):
+            return
+
+        # Blocked items are moved to the queue by _refill in the order they were put, so that the items put later
+        # without blocking can't overtake them
+        entry = (item, asyncio.get_running_loop().create_future())
+        self.blocked.append(entry)
+        try:
+            await entry[1]
+        except asyncio.CancelledError:
+            if entry in self.blocked:
+                self.blocked.remove(entry)
+            raise
+
+    def put_nowait(self, item) -> bool:
+        if self.closed:
+            self._dispenser.delivered(item)
+            return True
+
+        if self.spill:
+            self.spill.append(item)
+            return True
+
+        if self.blocked:
+            return False
+
+        if not self.queue.full():
+            self.queue.put_nowait(item)
+            return True
+
+        if self.overflow is OverflowPolicy.BLOCK:
+            return False
+        elif self.overflow is OverflowPolicy.DROP_NEWEST:
+            self._drop(item)
+        elif self.overflow is OverflowPolicy.DROP_OLDEST:
+            oldest = self.queue.get_nowait()
+            self.queue.put_nowait(item)
+            self._drop(oldest)
+        elif self.overflow is OverflowPolicy.SPILL:
+            self.spill.append(item)
+        return True
+
+    def subscribe(self, *types: t.Type) -> None:
+        self.types = types or None
+        self._dispenser.reindex()
+
+    def close(self) -> None:
+        """
+        Stop the :meth:`.put`\\ s blocked on this sentry from waiting, without putting their items in the
+        :attr:`.queue`, and consider the items put afterwards delivered immediately.
+
+        Once the items left in the :attr:`.queue` have been returned, getting another one raises
+        :exc:`.SentryClosedError` instead of waiting forever.
+
+        Called by the :class:`~royalnet.engineer.dispenser.Dispenser` when the sentry is removed.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        while self.blocked:
+            _, future = self.blocked.popleft()
+            if not future.done():
+                future.set_result(None)
+        self._refill()
+
+    def accepts(self, type_: t.Type) -> bool:
+        """
+        :param type_: The type of a projectile.
+        :return: Whether this sentry is subscribed to projectiles of the given type.
+        """
+        return self.types is None or issubclass(type_, self.types)
 
     def dispenser(self) -> Dispenser:
         return self._dispenser
 
 
 __all__ = (
+    "OverflowPolicy",
     "Sentry",
+    "SentryClosedError",
+    "SentryException",
     "SentryFilter",
     "SentrySource",
 )
@@ -6,10 +6,12 @@ acting similarly to function factories and allowing to easily define filter func
 from __future__ import annotations
 
 import abc
+import functools
 
 import royalnet.royaltyping as t
 from . import discard
 from . import exc
+from .bullet.projectiles import MessageReceived
 
 
 class WrenchException(exc.EngineerException):
@@ -39,6 +41,9 @@ class Wrench(metaclass=abc.ABCMeta):
 
         A special exception is available for discarding objects: :exc:`.discard.Discard`.
         If raised, the object will be silently ignored.
+
+        Returning :data:`.discard.DISCARD` has the same effect when the wrench is part of a
+        :class:`~royalnet.engineer.sentry.Sentry` pipeline, without the cost of raising an exception.
         """
         raise NotImplementedError()
 
@@ -49,36 +54,71 @@ class Wrench(metaclass=abc.ABCMeta):
         return self.filter(obj)
 
 
-class PassAll(Wrench):
+class SyncWrench(Wrench, metaclass=abc.ABCMeta):
+    """
+    The abstract base class for Wrenches which do not need to await anything.
+
+    :class:`~royalnet.engineer.sentry.SentryFilter`\\ s call :meth:`.filter_sync` directly, skipping the creation of a
+    coroutine for every object passing through the pipeline.
+    """
+
+    @abc.abstractmethod
+    def filter_sync(self, obj: t.Any) -> t.Any:
+        """
+        The synchronous version of :meth:`.filter`, with the same semantics.
+
+        Built-in wrenches return :data:`.discard.DISCARD` here instead of raising :exc:`.discard.Discard`.
+        """
+        raise NotImplementedError()
+
+    def error(self, obj: t.Any) -> str:
+        """
+        The error message to attach as :attr:`.Discard.message` if :meth:`.filter` discards the object.
+
+        :param obj: The object passing through the pipeline.
+        :return: The error message.
+        """
+        return f"Discarded by {self.__class__.__qualname__}"
+
+    async def filter(self, obj: t.Any) -> t.Any:
+        if (result := self.filter_sync(obj)) is discard.DISCARD:
+            raise discard.Discard(obj=obj, message=self.error(obj))
+        return result
+
+
+class PassAll(SyncWrench):
     """
     **Return** each received object as it is.
 
     .. note:: To be used only in testing.
     """
 
-    async def filter(self, obj: t.Any) -> t.Any:
+    def filter_sync(self, obj: t.Any) -> t.Any:
         return obj
 
 
-class DiscardAll(Wrench):
+class DiscardAll(SyncWrench):
     """
     **Discard** each received object.
 
     .. note:: To be used only in testing.
     """
 
-    async def filter(self, obj: t.Any) -> t.Any:
-        raise discard.Discard(obj, "Discard filter discards everything")
+    def filter_sync(self, obj: t.Any) -> t.Any:
+        return discard.DISCARD
+
+    def error(self, obj: t.Any) -> str:
+        return "Discard filter discards everything"
 
 
-class ErrorAll(Wrench):
+class ErrorAll(SyncWrench):
     """
     **Raise** :exc:`.exc.DeliberateException` for each received object.
 
     .. note:: To be used only in testing.
     """
 
-    async def filter(self, obj: t.Any) -> t.Any:
+    def filter_sync(self, obj: t.Any) -> t.Any:
         raise DeliberateException("ErrorAll received an object")
 
 
@@ -131,7 +171,36 @@ class CheckBase(Wrench, metaclass=abc.ABCMeta):
             raise discard.Discard(obj=obj, message=self.error(obj))
 
 
-class Type(CheckBase):
+class SyncCheckBase(SyncWrench, CheckBase, metaclass=abc.ABCMeta):
+    """
+    A :class:`.CheckBase` whose condition can be checked synchronously with :meth:`.check_sync`.
+    """
+
+    @abc.abstractmethod
+    def check_sync(self, obj: t.Any) -> bool:
+        """
+        The synchronous version of :meth:`.check`.
+
+        :param obj: The object passing through the pipeline.
+        :return: Whether the check was successful or not.
+        """
+        raise NotImplementedError()
+
+    async def check(self, obj: t.Any) -> bool:
+        return self.check_sync(obj)
+
+    async def filter(self, obj: t.Any) -> t.Any:
+        # Use the filter of CheckBase instead of the one of SyncWrench, so that subclasses overriding check are obeyed
+        return await CheckBase.filter(self, obj)
+
+    def filter_sync(self, obj: t.Any) -> t.Any:
+        if self.check_sync(obj) ^ self.invert:
+            return obj
+        else:
+            return discard.DISCARD
+
+
+class Type(SyncCheckBase):
     """
     Check the type of an object:
 
@@ -143,14 +212,14 @@ class Type(CheckBase):
         super().__init__(**kwargs)
         self.type: t.Type = type_
 
-    async def check(self, obj: t.Any) -> bool:
+    def check_sync(self, obj: t.Any) -> bool:
         return isinstance(obj, self.type)
 
     def error(self, obj: t.Any) -> str:
         return f"Not instance of type {self.type}"
 
 
-class StartsWith(CheckBase):
+class StartsWith(SyncCheckBase):
     """
     Check if an object :func:`startswith` a certain prefix.
     """
@@ -159,14 +228,14 @@ class StartsWith(CheckBase):
         super().__init__(**kwargs)
         self.prefix: str = prefix
 
-    async def check(self, obj: t.Any) -> bool:
+    def check_sync(self, obj: t.Any) -> bool:
         return obj.startswith(self.prefix)
 
     def error(self, obj: t.Any) -> str:
         return f"Didn't start with {self.prefix}"
 
 
-class EndsWith(CheckBase):
+class EndsWith(SyncCheckBase):
     """
     Check if an object :func:`endswith` a certain suffix.
     """
@@ -175,14 +244,14 @@ class EndsWith(CheckBase):
         super().__init__(**kwargs)
         self.suffix: str = suffix
 
-    async def check(self, obj: t.Any) -> bool:
+    def check_sync(self, obj: t.Any) -> bool:
         return obj.startswith(self.suffix)
 
     def error(self, obj: t.Any) -> str:
         return f"Didn't end with {self.suffix}"
 
 
-class Choice(CheckBase):
+class Choice(SyncCheckBase):
     """
     Check if an object is among the accepted list.
     """
@@ -194,14 +263,14 @@ class Choice(CheckBase):
         A collection of elements which can be chosen.
         """
 
-    async def check(self, obj: t.Any) -> bool:
+    def check_sync(self, obj: t.Any) -> bool:
         return obj in self.accepted
 
     def error(self, obj: t.Any) -> str:
         return f"Not a valid choice"
 
 
-class RegexCheck(CheckBase):
+class RegexCheck(SyncCheckBase):
     """
     Check if an object matches a regex pattern.
     """
@@ -213,14 +282,14 @@ class RegexCheck(CheckBase):
         The pattern that should be matched.
         """
 
-    async def check(self, obj: t.Any) -> bool:
+    def check_sync(self, obj: t.Any) -> bool:
         return bool(self.pattern.match(obj))
 
     def error(self, obj: t.Any) -> str:
         return f"Didn't match pattern {self.pattern}"
 
 
-class RegexMatch(Wrench):
+class RegexMatch(SyncWrench):
     """
     Apply a regex over an object:
 
@@ -235,14 +304,17 @@ class RegexMatch(Wrench):
         The pattern that should be matched.
         """
 
-    async def filter(self, obj: t.Any) -> t.Any:
+    def filter_sync(self, obj: t.Any) -> t.Any:
         if match := self.pattern.match(obj):
             return match
         else:
-            raise discard.Discard(obj, f"Didn't match pattern {obj}")
+            return discard.DISCARD
+
+    def error(self, obj: t.Any) -> str:
+        return f"Didn't match pattern {obj}"
 
 
-class RegexReplace(Wrench):
+class RegexReplace(SyncWrench):
     """
     Apply a regex over an object:
 
@@ -261,11 +333,11 @@ class RegexReplace(Wrench):
         The substitution string for the object.
         """
 
-    async def filter(self, obj: t.Any) -> t.Any:
+    def filter_sync(self, obj: t.Any) -> t.Any:
         return self.pattern.sub(self.replacement, obj)
 
 
-class Lambda(Wrench):
+class Lambda(SyncWrench):
     """
     Apply a syncronous function over the received objects.
     """
@@ -276,11 +348,11 @@ class Lambda(Wrench):
         The function to apply.
         """
 
-    async def filter(self, obj: t.Any) -> t.Any:
+    def filter_sync(self, obj: t.Any) -> t.Any:
         return self.func(obj)
 
 
-class Check(CheckBase):
+class Check(SyncCheckBase):
     """
     Check a condition on the received objects.
     """
@@ -292,16 +364,35 @@ class Check(CheckBase):
         The condition to check.
         """
 
-        self.error: str = error
+        self.error_message: str = error
         """
         The error message to display if the check fails.
         """
 
-    async def check(self, obj: t.Any) -> bool:
+    def check_sync(self, obj: t.Any) -> bool:
         return self.func(obj)
 
     def error(self, obj: t.Any) -> str:
-        return self.error
+        return self.error_message
+
+
+class MessageText(Wrench):
+    """
+    Get the text of the message of a :class:`~royalnet.engineer.bullet.projectiles.message.MessageReceived`:
+
+    - If the object is a :class:`~royalnet.engineer.bullet.projectiles.message.MessageReceived` with a text, **return**
+      the text;
+    - Otherwise, **discard** the object, returning :data:`.discard.DISCARD`.
+    """
+
+    async def filter(self, obj: t.Any) -> t.Any:
+        if not isinstance(obj, MessageReceived):
+            return discard.DISCARD
+        if not (msg := await obj.message):
+            return discard.DISCARD
+        if not (text := await msg.text):
+            return discard.DISCARD
+        return text
 
 
 class AsyncLambda(Wrench):
@@ -319,6 +410,45 @@ class AsyncLambda(Wrench):
         return await self.func(obj)
 
 
+def stage(wrench: t.WrenchLike) -> tuple[t.Callable[[t.Any], t.Any], bool]:
+    """
+    Prepare a :class:`.Wrench` or coroutine function to be applied in a pipeline.
+
+    :param wrench: The wrench to prepare.
+    :return: A :class:`tuple` of the function to call and of whether the function is synchronous, and its result
+             shouldn't be awaited.
+
+    .. seealso:: :class:`.SyncWrench`
+    """
+    if isinstance(wrench, SyncWrench) and _is_synchronous(type(wrench)):
+        return wrench.filter_sync, True
+    else:
+        return wrench, False
+
+
+@functools.cache
+def _is_synchronous(cls: t.Type[SyncWrench]) -> bool:
+    """
+    Check that the :meth:`.SyncWrench.filter_sync` of a class is consistent with its asynchronous methods, which isn't
+    the case if a subclass of a synchronous wrench overrides :meth:`.Wrench.filter` or :meth:`.CheckBase.check`
+    without overriding :meth:`.SyncWrench.filter_sync` as well.
+
+    The result is cached for each class, as the MRO is walked only once.
+
+    :param cls: The class of the wrench.
+    :return: Whether :meth:`.SyncWrench.filter_sync` can be called instead of :meth:`.Wrench.filter`.
+    """
+    owners = {}
+    for klass in reversed(cls.__mro__):
+        for name in ("filter_sync", "filter", "check"):
+            if name in klass.__dict__:
+                owners[name] = klass
+
+    mro = cls.__mro__
+    synchronous = mro.index(owners["filter_sync"])
+    return all(mro.index(owner) >= synchronous for owner in owners.values())
+
+
 __all__ = (
     "Check",
     "CheckBase",
@@ -326,12 +456,16 @@ __all__ = (
     "DeliberateException",
     "EndsWith",
     "Lambda",
+    "MessageText",
     "RegexCheck",
     "RegexMatch",
     "RegexReplace",
     "StartsWith",
+    "SyncCheckBase",
+    "SyncWrench",
     "Type",
     "Wrench",
     "WrenchException",
     "AsyncLambda",
+    "stage",
 )
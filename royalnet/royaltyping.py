@@ -40,6 +40,12 @@ AsyncFilter = Callable[[Any], Awaitable[Any]]
 A function taking an item as input, and returning it in a different form after being awaited.
 """
 
+WrenchLike = AsyncFilter
+"""
+Either a :class:`~royalnet.engineer.wrench.Wrench` or an :data:`.AsyncFilter`, which can be used as a filter in a
+:class:`~royalnet.engineer.sentry.Sentry` pipeline.
+"""
+
 
 class ConversationProtocol(Protocol):
     def __call__(self, **kwargs) -> Awaitable[None]:
@@ -0,0 +1,286 @@
+"""
+This module contains a lightweight structured tracing facility, which can be used to measure how long each step of
+handling something takes.
+
+Tracing is disabled until a sink is :meth:`~.Tracer.subscribe`\\ d to the :data:`.tracer`; while it is disabled,
+:meth:`.Tracer.span` returns a shared object which does nothing, so that instrumented code pays almost nothing for it.
+
+.. code-block::
+
+   recorder = SpanRecorder()
+   tracer.subscribe(recorder)
+   ...
+   for trace_id, spans in recorder.traces().items():
+       print(trace_id, recorder.breakdown(trace_id))
+"""
+
+from __future__ import annotations
+
+import collections
+import contextvars
+import itertools
+import time
+
+from .royaltyping import *
+
+_current: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("royalnet_current_span", default=None)
+"""
+The span which is currently active in the running context.
+"""
+
+_ids = itertools.count(1)
+"""
+The generator of the identifiers of the spans.
+"""
+
+
+class Span:
+    """
+    A timed step of a trace, used as a context manager: it starts when it is entered, and is sent to the sinks of its
+    :class:`.Tracer` when it is exited.
+
+    Spans entered while another span is active become its children, even across :func:`asyncio.create_task`, as the
+    active span is stored in a :class:`contextvars.ContextVar`.
+    """
+
+    __slots__ = ("tracer", "name", "attributes", "span_id", "parent_id", "trace_id", "start", "end", "error", "_token")
+
+    def __init__(self, tracer: "Tracer", name: str, attributes: Dict[str, Any]):
+        self.tracer: "Tracer" = tracer
+        """
+        The :class:`.Tracer` which created this span.
+        """
+
+        self.name: str = name
+        """
+        The name of the traced step, such as ``dispenser.put``.
+        """
+
+        self.attributes: Dict[str, Any] = attributes
+        """
+        The objects related to this span, which are stored as they are and formatted only by the sinks which need to.
+        """
+
+        self.span_id: int = next(_ids)
+        """
+        The identifier of this span.
+        """
+
+        self.parent_id: Optional[int] = None
+        """
+        The identifier of the span this one is a child of, or :data:`None` if this is the root span of its trace.
+        """
+
+        self.trace_id: int = self.span_id
+        """
+        The identifier of the trace this span belongs to, which is the :attr:`.span_id` of its root span.
+        """
+
+        self.start: float = 0.0
+        """
+        The :func:`time.perf_counter` time this span was entered at.
+        """
+
+        self.end: Optional[float] = None
+        """
+        The :func:`time.perf_counter` time this span was exited at, or :data:`None` if it is still active.
+        """
+
+        self.error: Optional[BaseException] = None
+        """
+        The exception which exited the span, if any.
+        """
+
+        self._token: Optional[contextvars.Token] = None
+
+    def __repr__(self):
+        return f"<{self.__class__.__qualname__} {self.name} #{self.span_id} of trace #{self.trace_id}>"
+
+    def __enter__(self) -> "Span":
+        if (parent := _current.get()) is not None:
+            self.parent_id = parent.span_id
+            self.trace_id = parent.trace_id
+        self._token = _current.set(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.end = time.perf_counter()
+        self.error = exc_val
+        _current.reset(self._token)
+        self._token = None
+        self.tracer.finish(self)
+
+    @property
+    def duration(self) -> Optional[float]:
+        """
+        How many seconds the span lasted, or :data:`None` if it is still active.
+        """
+        return self.end - self.start if self.end is not None else None
+
+    def set(self, **attributes) -> None:
+        """
+        Add attributes to the span.
+
+        :param attributes: The attributes to add.
+        """
+        self.attributes.update(attributes)
+
+
+class _NullSpan:
+    """
+    The span returned by a disabled :class:`.Tracer`, which does nothing.
+    """
+
+    __slots__ = ()
+
+    def __repr__(self):
+        return f"<{self.__class__.__qualname__}>"
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        pass
+
+    def set(self, **attributes) -> None:
+        pass
+
+
+NULL_SPAN = _NullSpan()
+"""
+The span returned by :meth:`.Tracer.span` while tracing is disabled.
+"""
+
+
+class Tracer:
+    """
+    An object creating :class:`.Span`\\ s and sending the finished ones to its :attr:`.sinks`.
+    """
+
+    def __init__(self):
+        self.sinks: List[Callable[[Span], None]] = []
+        """
+        The functions called with every finished :class:`.Span`; tracing is disabled while there are none.
+        """
+
+    def __repr__(self):
+        return f"<{self.__class__.__qualname__} with {len(self.sinks)} sinks>"
+
+    @property
+    def enabled(self) -> bool:
+        """
+        Whether tracing is enabled, which is if there is at least one sink.
+        """
+        return bool(self.sinks)
+
+    def subscribe(self, sink: Callable[[Span], None]) -> None:
+        """
+        Start sending finished spans to a sink, enabling tracing.
+
+        :param sink: The function to call with every finished :class:`.Span`.
+        """
+        self.sinks.append(sink)
+
+    def unsubscribe(self, sink: Callable[[Span], None]) -> None:
+        """
+        Stop sending finished spans to a sink, disabling tracing if it was the last one.
+
+        :param sink: The sink to remove.
+        """
+        self.sinks.remove(sink)
+
+    def span(self, name: str, **attributes) -> Union[Span, _NullSpan]:
+        """
+        Create a span, to be used as a context manager.
+
+        .. code-block::
+
+           with tracer.span("dispenser.put", projectile=item):
+               ...
+
+        :param name: The name of the traced step.
+        :param attributes: The objects related to the span.
+        :return: The created :class:`.Span`, or :data:`.NULL_SPAN` if tracing is disabled.
+        """
+        if not self.sinks:
+            return NULL_SPAN
+        return Span(self, name, attributes)
+
+    @staticmethod
+    def current() -> Optional[Span]:
+        """
+        :return: The :class:`.Span` active in the running context, or :data:`None` if there isn't one.
+        """
+        return _current.get()
+
+    def finish(self, span: Span) -> None:
+        """
+        Send a finished span to all the :attr:`.sinks`.
+
+        :param span: The finished :class:`.Span`.
+        """
+        for sink in self.sinks:
+            sink(span)
+
+
+class SpanRecorder:
+    """
+    A sink for :class:`.Tracer` which keeps the most recent finished :class:`.Span`\\ s in memory.
+    """
+
+    def __init__(self, max_spans: Optional[int] = 10000):
+        self.spans: Deque[Span] = collections.deque(maxlen=max_spans)
+        """
+        The recorded spans, in the order they finished.
+        """
+
+    def __call__(self, span: Span) -> None:
+        self.spans.append(span)
+
+    def __len__(self) -> int:
+        return len(self.spans)
+
+    def traces(self) -> Dict[int, List[Span]]:
+        """
+        :return: A :class:`dict` mapping the identifiers of the recorded traces to their spans, in the order they
+                 started.
+        """
+        result: Dict[int, List[Span]] = {}
+        for span in sorted(self.spans, key=lambda s: s.start):
+            result.setdefault(span.trace_id, []).append(span)
+        return result
+
+    def breakdown(self, trace_id: int) -> Dict[str, float]:
+        """
+        Get how many seconds were spent in each step of a trace.
+
+        :param trace_id: The identifier of the trace.
+        :return: A :class:`dict` mapping the names of the spans of the trace to their total duration.
+        """
+        result: Dict[str, float] = {}
+        for span in self.spans:
+            if span.trace_id == trace_id:
+                result[span.name] = result.get(span.name, 0.0) + span.duration
+        return result
+
+    def clear(self) -> None:
+        """
+        Forget all the recorded spans.
+        """
+        self.spans.clear()
+
+
+tracer = Tracer()
+"""
+The :class:`.Tracer` used by :mod:`royalnet`.
+"""
+
+
+__all__ = (
+    "NULL_SPAN",
+    "Span",
+    "SpanRecorder",
+    "Tracer",
+    "tracer",
+)
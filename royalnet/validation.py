@@ -2,15 +2,49 @@
 This module contains various objects used to perform validation on function inputs and outputs.
 """
 
+import abc
+import asyncio
 import pydantic
+import pydantic.error_wrappers
+import pydantic.errors
 import inspect
 import logging
+import random
+import types
 
 from .royaltyping import *
 from .exc import RoyalnetException
+from .tracing import tracer
 
 log = logging.getLogger(__name__)
 
+_models: Dict[Hashable, Type[pydantic.BaseModel]] = {}
+"""
+A cache of the models created by :class:`.ValidatingFunction`\\ s, keyed by the signature they were created from, so
+that functions with the same signature share them.
+"""
+
+_UNSAFE_TYPES = (pydantic.BaseModel, list, tuple, dict, set, frozenset)
+"""
+Types which :mod:`pydantic` may copy or convert while validating, even if the value already has the exact type.
+"""
+
+
+def _exact_type(annotation: Any) -> Optional[type]:
+    """
+    Get the type that a value must have to be returned unchanged by :mod:`pydantic` when validated against an
+    annotation.
+
+    :param annotation: The annotation to check.
+    :return: The exact type, or :data:`None` if the annotation is not a plain class that can be safely checked.
+    """
+    if annotation is None:
+        return type(None)
+    if isinstance(annotation, type) and annotation is not inspect.Parameter.empty \
+            and not issubclass(annotation, _UNSAFE_TYPES):
+        return annotation
+    return None
+
 
 class ValidationError(RoyalnetException, pydantic.ValidationError):
     """
@@ -30,33 +64,418 @@ class OutputValidationError(ValidationError):
     """
 
 
+class ValidationBackend(metaclass=abc.ABCMeta):
+    """
+    A way to validate the input parameters and the return value of a :class:`.ValidatingFunction`.
+
+    An instance of the backend is created for each :class:`.ValidatingFunction`, the first time it validates
+    something.
+    """
+
+    def __init__(self, function: "ValidatingFunction"):
+        self.function: "ValidatingFunction" = function
+        """
+        The :class:`.ValidatingFunction` this backend is validating.
+        """
+
+    def __repr__(self):
+        return f"<{self.__class__.__qualname__} of {self.function!r}>"
+
+    @classmethod
+    def supports(cls, function: "ValidatingFunction") -> bool:
+        """
+        Check if this backend can validate the given function.
+
+        :param function: The :class:`.ValidatingFunction` to check.
+        :return: :data:`True` if the backend can be used, :data:`False` otherwise.
+        """
+        return True
+
+    @abc.abstractmethod
+    def validate_input(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Validate the input parameters.
+
+        :param kwargs: The keyword arguments passed to the function which do not start with ``_``.
+        :return: The validated keyword arguments.
+        :raises .InputValidationError: If the kwargs fail the validation.
+        """
+        raise NotImplementedError()
+
+    @abc.abstractmethod
+    def validate_output(self, value: Any) -> Any:
+        """
+        Validate the return value.
+
+        :param value: The value returned by the function.
+        :return: The validated value.
+        :raises .OutputValidationError: If the value fails the validation.
+        """
+        raise NotImplementedError()
+
+
+class PydanticBackend(ValidationBackend):
+    """
+    A :class:`.ValidationBackend` which validates values using the :mod:`pydantic` models of the
+    :class:`.ValidatingFunction`.
+
+    It supports everything :mod:`pydantic` does, including :func:`pydantic.Field` defaults and constraints.
+    """
+
+    def validate_input(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        return self.function._validate_input(**kwargs).dict()
+
+    def validate_output(self, value: Any) -> Any:
+        # noinspection PyUnresolvedReferences
+        return self.function.teleport_out(value).__root__
+
+
+def _check_none(value: Any) -> Any:
+    if value is not None:
+        raise pydantic.errors.NoneIsAllowedError()
+    return value
+
+
+def _check_str(value: Any) -> Any:
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode()
+    if isinstance(value, (int, float)):
+        return str(value)
+    raise pydantic.errors.StrError()
+
+
+def _check_int(value: Any) -> Any:
+    if isinstance(value, int) and not (value is True or value is False):
+        return value
+    try:
+        return int(value)
+    except (TypeError, ValueError, OverflowError):
+        raise pydantic.errors.IntegerError()
+
+
+def _check_float(value: Any) -> Any:
+    if isinstance(value, float):
+        return value
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise pydantic.errors.FloatError()
+
+
+_BOOL_VALUES = {
+    0: False, "0": False, "off": False, "f": False, "false": False, "n": False, "no": False,
+    1: True, "1": True, "on": True, "t": True, "true": True, "y": True, "yes": True,
+}
+
+
+def _check_bool(value: Any) -> Any:
+    if value is True or value is False:
+        return value
+    if isinstance(value, bytes):
+        value = value.decode()
+    if isinstance(value, str):
+        value = value.lower()
+    try:
+        return _BOOL_VALUES[value]
+    except (KeyError, TypeError):
+        raise pydantic.errors.BoolError()
+
+
+_SIMPLE_CHECKS: Dict[type, Callable[[Any], Any]] = {
+    str: _check_str,
+    int: _check_int,
+    float: _check_float,
+    bool: _check_bool,
+}
+"""
+The functions used by :class:`.SimpleBackend` to check and coerce values of each supported type.
+"""
+
+
+def _simple_check(annotation: Any) -> Callable[[Any], Any]:
+    """
+    Create a function which checks and coerces a value like :mod:`pydantic` would for the given annotation.
+
+    :param annotation: The annotation to check values against.
+    :return: The created function, which raises one of the :mod:`pydantic.errors` if the value is invalid.
+    :raises TypeError: If the annotation is not supported.
+    """
+    if annotation is Any or annotation is inspect.Parameter.empty:
+        return lambda value: value
+
+    if annotation is None or annotation is type(None):
+        return _check_none
+
+    origin = get_origin(annotation)
+
+    if origin is Literal:
+        permitted = get_args(annotation)
+        allowed = {value: value for value in permitted}
+
+        def check_literal(value: Any) -> Any:
+            try:
+                return allowed[value]
+            except (KeyError, TypeError):
+                raise pydantic.errors.WrongConstantError(given=value, permitted=permitted)
+
+        return check_literal
+
+    if origin is Union or origin is types.UnionType:
+        args = get_args(annotation)
+        nullable = type(None) in args
+        checks = tuple(_simple_check(arg) for arg in args if arg is not type(None))
+
+        def check_union(value: Any) -> Any:
+            if value is None:
+                if nullable:
+                    return None
+                raise pydantic.errors.NoneIsNotAllowedError()
+            error = None
+            for check in checks:
+                try:
+                    return check(value)
+                except (ValueError, TypeError, AssertionError) as e:
+                    error = e
+            raise error
+
+        return check_union
+
+    if (check := _SIMPLE_CHECKS.get(annotation)) is not None:
+        def check_scalar(value: Any) -> Any:
+            if value is None:
+                raise pydantic.errors.NoneIsNotAllowedError()
+            return check(value)
+
+        return check_scalar
+
+    raise TypeError(f"Unsupported annotation: {annotation!r}")
+
+
+class SimpleBackend(ValidationBackend):
+    """
+    A :class:`.ValidationBackend` which validates values without creating :mod:`pydantic` models, by directly checking
+    and coercing them with the same rules :mod:`pydantic` uses.
+
+    It only supports functions whose annotations are :class:`str`, :class:`int`, :class:`float`, :class:`bool`,
+    :data:`None`, :data:`~typing.Any`, :data:`~typing.Literal`, or :data:`~typing.Optional` and
+    :data:`~typing.Union` of those, and whose :func:`pydantic.Field` defaults have no constraints.
+    """
+
+    def __init__(self, function: "ValidatingFunction"):
+        super().__init__(function)
+
+        signature: inspect.Signature = inspect.signature(function.f)
+
+        self.fields: Dict[str, Tuple[Callable[[Any], Any], Any]] = {}
+        """
+        A :class:`dict` mapping the names of the parameters to their check function and their default value, which
+        is :data:`Ellipsis` for required parameters.
+        """
+
+        if function.validate_input:
+            for key, value in signature.parameters.items():
+                if key.startswith("_"):
+                    continue
+                if value.kind in (inspect.Parameter.VAR_POSITIONAL, inspect.Parameter.VAR_KEYWORD):
+                    raise TypeError(f"Unsupported parameter: {value!r}")
+                default = value.default
+                if isinstance(default, pydantic.fields.FieldInfo):
+                    if default.get_constraints() or default.default_factory is not None:
+                        raise TypeError(f"Unsupported field: {default!r}")
+                    default = default.default
+                elif default is inspect.Parameter.empty:
+                    default = ...
+                self.fields[key] = (_simple_check(value.annotation), default)
+
+        self.returns: Optional[Callable[[Any], Any]] = None
+        """
+        The check function of the return value, or :data:`None` if it shouldn't be validated.
+        """
+
+        if function.validate_output:
+            self.returns = _simple_check(signature.return_annotation)
+
+        self._error_models: Dict[str, Type[pydantic.BaseModel]] = {}
+
+    @classmethod
+    def supports(cls, function: "ValidatingFunction") -> bool:
+        try:
+            cls(function)
+        except TypeError:
+            return False
+        return True
+
+    def _error_model(self, kind: str) -> Type[pydantic.BaseModel]:
+        """
+        Get an empty model to attach to the raised :class:`.ValidationError`\\ s, so that they are displayed like
+        the ones raised by :class:`.PydanticBackend`.
+
+        :param kind: Either ``Input`` or ``Output``.
+        :return: The model.
+        """
+        if (model := self._error_models.get(kind)) is None:
+            model = pydantic.create_model(
+                f"{self.function.__class__.__name__}{kind}Model",
+                __config__=self.function.ModelConfig,
+            )
+            self._error_models[kind] = model
+        return model
+
+    def validate_input(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        result = {}
+        errors = []
+        for key, (check, default) in self.fields.items():
+            if key not in kwargs:
+                if default is ...:
+                    errors.append(pydantic.error_wrappers.ErrorWrapper(pydantic.errors.MissingError(), loc=key))
+                else:
+                    result[key] = default
+                continue
+            try:
+                result[key] = check(kwargs[key])
+            except (ValueError, TypeError, AssertionError) as e:
+                errors.append(pydantic.error_wrappers.ErrorWrapper(e, loc=key))
+
+        if errors:
+            error = InputValidationError(errors=errors, model=self._error_model("Input"))
+            log.error(f"Input validation failed: {error!r}")
+            raise error
+        return result
+
+    def validate_output(self, value: Any) -> Any:
+        try:
+            return self.returns(value)
+        except (ValueError, TypeError, AssertionError) as e:
+            error = OutputValidationError(
+                errors=[pydantic.error_wrappers.ErrorWrapper(e, loc="__root__")],
+                model=self._error_model("Output"),
+            )
+            log.error(f"Output validation failed: {error!r}")
+            raise error
+
+
 class ValidatingFunction:
     """
-    A function wrapper which uses :mod:`pydantic` to optionally perform type checking on arguments and return value.
+    A function wrapper which uses a :class:`.ValidationBackend` to optionally perform type checking on arguments and
+    return value.
+    """
+
+    default_backends: Tuple[Type[ValidationBackend], ...] = (PydanticBackend,)
+    """
+    The :class:`.ValidationBackend`\\ s used if none are specified.
     """
 
-    def __init__(self, f: Callable[..., Any], validate_input: bool = True, validate_output: bool = True):
+    def __init__(self,
+                 f: Callable[..., Any],
+                 validate_input: bool = True,
+                 validate_output: bool = True,
+                 backends: Optional[Sequence[Type[ValidationBackend]]] = None,
+                 sample_rate: float = 1.0,
+                 shadow: bool = False):
         self.f: Callable[..., Any] = f
         """
         The function which is having its parameters and return value validated.
         """
 
-        self.InputModel: Type[pydantic.BaseModel] = self._create_input_model() if validate_input else None
+        self.validate_input: bool = validate_input
+        """
+        Whether the input parameters should be validated.
+        """
+
+        self.validate_output: bool = validate_output
+        """
+        Whether the return value should be validated.
+        """
+
+        self.is_coroutine: bool = inspect.iscoroutinefunction(f)
+        """
+        Whether :attr:`.f` is a coroutine function.
+        """
+
+        self.sample_rate: float = sample_rate
+        """
+        The fraction of calls, between ``0.0`` and ``1.0``, whose return value should be validated.
+
+        The input parameters of every call are always validated, as validating them also converts them to the
+        annotated types.
+        """
+
+        self.shadow: bool = shadow
+        """
+        Whether the return value should be validated in shadow mode: if :data:`True`, it is validated after being
+        returned to the caller, and failures are only logged and counted in :attr:`.shadow_failures` instead of being
+        raised.
+        """
+
+        self.shadow_failures: int = 0
+        """
+        The number of return values which failed validation in shadow mode.
+        """
+
+        self.backends: Tuple[Type[ValidationBackend], ...] = \
+            tuple(backends) if backends is not None else self.default_backends
+        """
+        The :class:`.ValidationBackend`\\ s which can be used, in order of preference: the first one which
+        :meth:`~.ValidationBackend.supports` :attr:`.f` is used.
+
+        .. code-block::
+
+           ValidatingFunction(f, backends=(SimpleBackend, PydanticBackend))
+        """
+
+        self._backend: Optional[ValidationBackend] = None
+        self._input_model: Optional[Type[pydantic.BaseModel]] = None
+        self._output_model: Optional[Type[pydantic.BaseModel]] = None
+        self._plan: Optional[Tuple[Optional[Dict[str, type]], Tuple[str, ...], Optional[type]]] = None
+
+    @property
+    def InputModel(self) -> Optional[Type[pydantic.BaseModel]]:
         """
         The :mod:`pydantic` model used to validate input parameters, or :data:`None` if they should not be validated.
+
+        It is created the first time it is needed.
         """
+        if self.validate_input and self._input_model is None:
+            self._input_model = self._create_input_model()
+        return self._input_model
 
-        self.OutputModel: Type[pydantic.BaseModel] = self._create_output_model() if validate_output else None
+    @property
+    def OutputModel(self) -> Optional[Type[pydantic.BaseModel]]:
         """
         The :mod:`pydantic` model used to validate the return value, or :data:`None` if it shouldn't be validated.
+
+        It is created the first time it is needed.
         """
+        if self.validate_output and self._output_model is None:
+            self._output_model = self._create_output_model()
+        return self._output_model
+
+    @property
+    def backend(self) -> ValidationBackend:
+        """
+        The :class:`.ValidationBackend` used to validate :attr:`.f`, chosen among :attr:`.backends` the first time it
+        is needed.
+
+        :raises TypeError: If none of the :attr:`.backends` supports :attr:`.f`.
+        """
+        if self._backend is None:
+            for backend in self.backends:
+                if backend.supports(self):
+                    log.debug(f"Using {backend!r} to validate {self.f!r}")
+                    self._backend = backend(self)
+                    break
+            else:
+                raise TypeError(f"None of {self.backends!r} can validate {self.f!r}")
+        return self._backend
 
     def __repr__(self):
-        if self.InputModel and self.OutputModel:
+        if self.validate_input and self.validate_output:
             validation = "validating input and output"
-        elif self.InputModel:
+        elif self.validate_input:
             validation = "validating only input"
-        elif self.OutputModel:
+        elif self.validate_output:
             validation = "validating only output"
         else:
             validation = "not validating anything"
@@ -115,20 +534,26 @@ class ValidatingFunction:
         log.debug(f"Getting function signature of: {self.f!r}")
         signature: inspect.Signature = inspect.signature(self.f)
 
+        parameters = tuple(value for key, value in signature.parameters.items() if not key.startswith("_"))
+        cache_key = ("input", self.__class__.__name__, self.ModelConfig, parameters) if not extra_fields else None
+        if (model := self._cached_model(cache_key)) is not None:
+            return model
+
         log.debug(f"Converting parameter annotations of {self.f!r} to fields...")
         fields = {
-            key: self._parameter_to_field(value)
-            for key, value in signature.parameters.items()
-            if not key.startswith("_")
+            value.name: self._parameter_to_field(value)
+            for value in parameters
         }
 
         log.debug(f"Creating input model with parsed fields {fields!r} and extra fields {extra_fields!r}...")
-        return pydantic.create_model(
+        model = pydantic.create_model(
             f"{self.__class__.__name__}InputModel",
             __config__=self.ModelConfig,
             **fields,
             **extra_fields
         )
+        self._cache_model(cache_key, model)
+        return model
 
     def _create_output_model(self) -> Type[pydantic.BaseModel]:
         """
@@ -142,12 +567,111 @@ class ValidatingFunction:
         log.debug(f"Getting function signature of: {self.f!r}")
         signature: inspect.Signature = inspect.signature(self.f)
 
+        cache_key = ("output", self.__class__.__name__, self.ModelConfig, signature.return_annotation)
+        if (model := self._cached_model(cache_key)) is not None:
+            return model
+
         log.debug(f"Creating output model...")
-        return pydantic.create_model(
+        model = pydantic.create_model(
             f"{self.__class__.__name__}OutputModel",
             __config__=self.ModelConfig,
             __root__=(signature.return_annotation, pydantic.Field(..., title="Returns"))
         )
+        self._cache_model(cache_key, model)
+        return model
+
+    @staticmethod
+    def _cached_model(key: Optional[Hashable]) -> Optional[Type[pydantic.BaseModel]]:
+        """
+        Get a model from the models cache.
+
+        :param key: The key of the model, or :data:`None` if it shouldn't be cached.
+        :return: The cached model, or :data:`None` if it isn't cached.
+        """
+        if key is None:
+            return None
+        try:
+            return _models.get(key)
+        except TypeError:
+            # Some annotation or default value isn't hashable
+            return None
+
+    @staticmethod
+    def _cache_model(key: Optional[Hashable], model: Type[pydantic.BaseModel]) -> None:
+        """
+        Store a model in the models cache.
+
+        :param key: The key of the model, or :data:`None` if it shouldn't be cached.
+        :param model: The model to cache.
+        """
+        if key is None:
+            return
+        try:
+            _models[key] = model
+        except TypeError:
+            pass
+
+    def _create_plan(self) -> Tuple[Optional[Dict[str, type]], Tuple[str, ...], Optional[type]]:
+        """
+        Precompute what is needed to skip :mod:`pydantic` when the values passed to or returned from :attr:`.f`
+        already have exactly the annotated types.
+
+        :return: A :class:`tuple` of:
+
+                 - a :class:`dict` mapping parameter names to their exact types, or :data:`None` if the input can't
+                   skip validation;
+                 - a :class:`tuple` of the parameter names which must be passed for the input to skip validation;
+                 - the exact type of the return value, or :data:`None` if the output can't skip validation.
+        """
+        signature: inspect.Signature = inspect.signature(self.f)
+
+        types: Optional[Dict[str, type]] = {}
+        required = []
+        for key, value in signature.parameters.items():
+            if key.startswith("_"):
+                continue
+            if value.kind in (inspect.Parameter.VAR_POSITIONAL, inspect.Parameter.VAR_KEYWORD):
+                types = None
+                break
+            if (exact := _exact_type(value.annotation)) is None:
+                types = None
+                break
+            if isinstance(value.default, pydantic.fields.FieldInfo):
+                # The constraints of the field, such as gt or max_length, can only be checked by pydantic
+                types = None
+                break
+            types[key] = exact
+            if value.default is inspect.Parameter.empty:
+                required.append(key)
+
+        return types, tuple(required), _exact_type(signature.return_annotation)
+
+    def _fast_input(self, kwargs: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Try to skip the validation of the input parameters, which is possible if all of them already have exactly the
+        annotated types.
+
+        :param kwargs: The keyword arguments passed to the function.
+        :return: The keyword arguments that should be passed to :attr:`.f`, or :data:`None` if they should be validated.
+        """
+        types, required, _ = self._plan
+        if types is None:
+            return None
+
+        result = {}
+        for key, value in kwargs.items():
+            if key.startswith("_"):
+                result[key] = value
+            elif (exact := types.get(key)) is not None:
+                if value.__class__ is not exact:
+                    return None
+                result[key] = value
+
+        for key in required:
+            if key not in kwargs:
+                return None
+
+        return result
 
     def _validate_input(self, **kwargs) -> pydantic.BaseModel:
         """
@@ -157,7 +681,7 @@ class ValidatingFunction:
         :return: The created model.
         :raises .InputValidationError: If the kwargs fail the validation.
         """
-        log.debug(f"Validating input: {kwargs!r}")
+        log.debug("Validating input: %r", kwargs)
         try:
             return self.InputModel(**kwargs)
         except pydantic.ValidationError as e:
@@ -173,7 +697,7 @@ class ValidatingFunction:
         :raises .OutputValidationError: If the value fails the validation.
         """
 
-        log.debug(f"Validating output: {value!r}")
+        log.debug("Validating output: %r", value)
         try:
             return self.OutputModel(__root__=value)
         except pydantic.ValidationError as e:
@@ -194,53 +718,95 @@ class ValidatingFunction:
         extra_params = {}
         for key, value in kwargs.items():
             if key.startswith("_"):
-                log.debug(f"Found extra keyword argument: {key}")
                 extra_params[key] = value
             else:
-                log.debug(f"Found model keyword argument: {key}")
                 model_params[key] = value
         return model_params, extra_params
 
-    def _run(self, **kwargs) -> Any:
+    def _sampled(self) -> bool:
         """
-        Run the :class:`.ValidatingFunction` synchronously.
+        :return: Whether the return value of the current call should be validated, according to :attr:`.sample_rate`.
         """
+        return self.sample_rate >= 1.0 or random.random() < self.sample_rate
 
-        if self.InputModel:
-            log.debug("Validating input...")
-            model_kwargs, extra_kwargs = self._split_kwargs(**kwargs)
-            model_kwargs = self._validate_input(**kwargs).dict()
-            kwargs = {**model_kwargs, **extra_kwargs}
+    def _prepare_input(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Validate the input parameters, if needed.
 
-        result = self.f(**kwargs)
+        :param kwargs: The keyword arguments passed to the function.
+        :return: The keyword arguments that should be passed to :attr:`.f`.
+        """
+        if not self.validate_input:
+            return kwargs
 
-        if self.OutputModel:
-            # noinspection PyUnresolvedReferences
-            result = self.teleport_out(result).__root__
+        if self._plan is None:
+            self._plan = self._create_plan()
 
-        return result
+        if (fast := self._fast_input(kwargs)) is not None:
+            return fast
+
+        model_kwargs, extra_kwargs = self._split_kwargs(**kwargs)
+        with tracer.span("validation.input", function=self.f):
+            model_kwargs = self.backend.validate_input(model_kwargs)
+        return {**model_kwargs, **extra_kwargs}
 
-    def _run_async(self, **kwargs) -> Awaitable[Any]:
+    def _prepare_output(self, result: Any, sampled: bool = True) -> Any:
         """
-        Run the :class:`.ValidatingFunction` asynchronously.
+        Validate the return value, if needed.
+
+        :param result: The value returned by :attr:`.f`.
+        :param sampled: Whether the return value of the current call should be validated.
+        :return: The value that should be returned to the caller.
         """
+        if not self.validate_output or not sampled:
+            return result
 
-        if self.InputModel:
-            log.debug("Validating input...")
-            model_kwargs, extra_kwargs = self._split_kwargs(**kwargs)
-            model_kwargs = self._validate_input(**kwargs).dict()
-            kwargs = {**model_kwargs, **extra_kwargs}
+        if self._plan is None:
+            self._plan = self._create_plan()
 
-        result = await self.f(**kwargs)
+        if (exact := self._plan[2]) is not None and result.__class__ is exact:
+            return result
 
-        if self.OutputModel:
-            # noinspection PyUnresolvedReferences
-            result = self.teleport_out(result).__root__
+        if self.shadow:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                self._shadow_output(result)
+            else:
+                loop.call_soon(self._shadow_output, result)
+            return result
 
-        return result
+        with tracer.span("validation.output", function=self.f):
+            return self.backend.validate_output(result)
+
+    def _shadow_output(self, result: Any) -> None:
+        """
+        Validate the return value in shadow mode, counting the failure instead of raising it.
+
+        :param result: The value returned by :attr:`.f`.
+        """
+        try:
+            self.backend.validate_output(result)
+        except OutputValidationError:
+            self.shadow_failures += 1
+        except Exception:
+            log.exception(f"Shadow validation of the value returned by {self.f!r} failed unexpectedly")
+            self.shadow_failures += 1
+
+    def _run(self, **kwargs) -> Any:
+        """
+        Run the :class:`.ValidatingFunction` synchronously.
+        """
+        return self._prepare_output(self.f(**self._prepare_input(kwargs)), self._sampled())
+
+    async def _run_async(self, **kwargs) -> Any:
+        """
+        Run the :class:`.ValidatingFunction` asynchronously.
+        """
+        return self._prepare_output(await self.f(**self._prepare_input(kwargs)), self._sampled())
 
     def __call__(self, *args, **kwargs):
-        if inspect.iscoroutinefunction(self.f):
+        if self.is_coroutine:
             return self._run_async(**kwargs)
         else:
             return self._run(**kwargs)
@@ -250,5 +816,8 @@ __all__ = (
     "ValidationError",
     "InputValidationError",
     "OutputValidationError",
+    "ValidationBackend",
+    "PydanticBackend",
+    "SimpleBackend",
     "ValidatingFunction",
 )